@@ -0,0 +1,179 @@
+"""
+Creación masiva para vistas DRF: POST con una lista de objetos, validación
+por elemento y bulk_create, con un resultado por elemento
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, transaction
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que resuelve contra objetos ya cargados con una
+    sola consulta (in_bulk), en lugar de un get() por elemento del lote
+    """
+
+    def __init__(self, objects, **kwargs):
+        self.objects = objects
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.objects:
+            self.fail('does_not_exist', pk_value=data)
+        return self.objects[pk]
+
+
+class BulkCreateMixin:
+    """
+    Para GenericAPIView: `post` recibe una lista, la valida con el serializer
+    (many=True) elemento por elemento y guarda los válidos con bulk_create.
+
+    - Las claves foráneas se cargan con una consulta por campo (in_bulk)
+    - La unicidad se comprueba con una consulta por campo, incluidos los
+      duplicados dentro del mismo lote
+    - `bulk_chunk_size = None` inserta todo en una transacción; con un número,
+      cada bloque va en su propia transacción y un error de base de datos
+      solo marca los elementos de ese bloque
+
+    Responde 201 si se creó todo, 207 si hubo errores parciales y 400 si no
+    se creó nada. Cada resultado es {'index', 'status', 'id'} o {'index', 'status', 'errors'}
+    """
+    bulk_chunk_size = None
+    bulk_max_items = None
+
+    def get_bulk_max_items(self):
+        return self.bulk_max_items or getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+
+    def prepare_bulk_data(self, validated_items):
+        """Punto de extensión: ajustar en bloque los datos válidos antes de instanciarlos"""
+
+    def build_instance(self, validated_data):
+        """Instancia (sin guardar) para un elemento válido"""
+        return self.get_serializer_class().Meta.model(**validated_data)
+
+    def after_bulk_create(self, instances):
+        """Punto de extensión: bulk_create no emite post_save"""
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Se esperaba una lista de objetos'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        max_items = self.get_bulk_max_items()
+        if len(items) > max_items:
+            return Response(
+                {'error': f'Máximo {max_items} elementos por lote'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        child = self.get_serializer(data=items, many=True).child
+        unique_fields = self._prepare_bulk_fields(child, items)
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                results[index] = {'index': index, 'status': 'error', 'errors': exc.detail}
+
+        valid = self._check_unique(child, unique_fields, valid, results)
+        self.prepare_bulk_data([data for _, data in valid])
+        created = self._bulk_insert(child.Meta.model, valid, results)
+        if created:
+            self.after_bulk_create(created)
+
+        errors = sum(1 for result in results if result['status'] == 'error')
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif errors == len(items):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(
+            {'created': len(items) - errors, 'errors': errors, 'results': results},
+            status=response_status,
+        )
+
+    def _prepare_bulk_fields(self, child, items):
+        """
+        Reemplaza las FKs por PreloadedPrimaryKeyRelatedField y quita los
+        UniqueValidator (se comprueban en bloque). Retorna {campo: validator}
+        """
+        unique_fields = {}
+        for name, field in list(child.fields.items()):
+            if field.read_only:
+                continue
+            unique = [validator for validator in field.validators if isinstance(validator, UniqueValidator)]
+            validators = [validator for validator in field.validators if not isinstance(validator, UniqueValidator)]
+            if unique:
+                unique_fields[name] = unique[0]
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                queryset = field.get_queryset()
+                pk_field = queryset.model._meta.pk
+                keys = set()
+                for item in items:
+                    value = item.get(field.field_name) if isinstance(item, dict) else None
+                    try:
+                        if value is not None and not isinstance(value, bool):
+                            keys.add(pk_field.to_python(value))
+                    except DjangoValidationError:
+                        pass
+                options = {'source': field.source} if field.source != name else {}
+                child.fields[name] = PreloadedPrimaryKeyRelatedField(
+                    queryset.in_bulk(keys) if keys else {},
+                    queryset=queryset, required=field.required, allow_null=field.allow_null,
+                    validators=validators, **options,
+                )
+            else:
+                field.validators = validators
+        return unique_fields
+
+    def _check_unique(self, child, unique_fields, valid, results):
+        """Una consulta por campo único; también detecta duplicados dentro del lote"""
+        model = child.Meta.model
+        for name, validator in unique_fields.items():
+            source = child.fields[name].source
+            values = [data[source] for _, data in valid if data.get(source) is not None]
+            if not values:
+                continue
+            existing = set(model.objects.filter(**{f'{source}__in': values}).values_list(source, flat=True))
+            seen = set()
+            remaining = []
+            for index, data in valid:
+                key = getattr(data.get(source), 'pk', data.get(source))
+                if key is not None and (key in existing or key in seen):
+                    results[index] = {'index': index, 'status': 'error', 'errors': {name: [validator.message]}}
+                    continue
+                seen.add(key)
+                remaining.append((index, data))
+            valid = remaining
+        return valid
+
+    def _bulk_insert(self, model, valid, results):
+        created = []
+        chunk_size = self.bulk_chunk_size or max(len(valid), 1)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            instances = [self.build_instance(data) for _, data in chunk]
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(instances)
+            except DatabaseError as exc:
+                for index, _ in chunk:
+                    results[index] = {'index': index, 'status': 'error', 'errors': {'non_field_errors': [str(exc)]}}
+                continue
+            for (index, _), instance in zip(chunk, instances):
+                results[index] = {'index': index, 'status': 'created', 'id': instance.pk}
+            created.extend(instances)
+        return created
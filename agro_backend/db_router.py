@@ -0,0 +1,58 @@
+"""
+Lecturas a la réplica (alias 'replica') para las apps de DATABASE_REPLICA_APPS;
+las escrituras y todo lo demás van a 'default'. Se activa por despliegue con
+DATABASE_REPLICA_ENABLED.
+
+Leer lo propio: desde la primera escritura de una petición (o desde el
+inicio si su método no es seguro, ver ReplicaPinningMiddleware) el resto de
+sus lecturas va a 'default', que ya tiene ese cambio aunque la réplica no
+"""
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Con gevent (monkey patch) es local a cada greenlet, es decir, a cada petición
+_state = threading.local()
+
+
+def pin_to_primary():
+    """Las lecturas siguientes de este greenlet van a 'default'"""
+    _state.pinned = True
+
+
+def unpin():
+    _state.pinned = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in settings.DATABASE_REPLICA_APPS:
+            return None
+        # Dentro de una transacción se lee lo que ella misma ve
+        if is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica es una copia de 'default': sus objetos se pueden relacionar
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,164 @@
+"""
+Datos de ejemplo reutilizables: los usan los tests de presupuesto de
+consultas (agro_backend.testing), el comando load_test y los benchmarks
+"""
+import random
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from apps.authentication.models import Company, Role, User
+from apps.production.models import Inspection, Product, QualityReport, Sample, Shipment
+from apps.quality_data.models import QualityData
+
+PASSWORD = 'clave-segura-123'
+
+
+def seed_dataset(rows=12):
+    """
+    Crea un conjunto de datos fijo. `rows` controla cuántos registros
+    se crean por tabla para poder comprobar que las consultas no escalan
+    """
+    roles = {
+        name: Role.objects.get_or_create(name=name)[0]
+        for name, _ in Role.ROLE_CHOICES
+    }
+
+    company = Company.objects.create(
+        name='Agro Test', domain='agrotest.com', rubro='fruticultura', pais='PE'
+    )
+    other_company = Company.objects.create(
+        name='Otra Empresa', domain='otra.com', rubro='agricultura', pais='CL'
+    )
+
+    admin = User.objects.create_user(
+        email='admin@agrotest.com', password=PASSWORD, first_name='Admin', last_name='Test',
+        company=company, role=roles['admin'], is_staff=True,
+    )
+    add_users(company, roles['viewer'], rows)
+    add_users(other_company, roles['operator'], rows, prefix='otro')
+
+    add_companies(rows, roles['viewer'])
+
+    product = Product.objects.create(name='Arándano', variety='Biloxi')
+    for index in range(rows):
+        Product.objects.create(name=f'Producto {index}', variety='Variedad')
+    add_shipments(product, admin, rows)
+    add_quality_data(company, rows)
+
+    return {
+        'admin': admin,
+        'company': company,
+        'other_company': other_company,
+        'product': product,
+        'roles': roles,
+    }
+
+
+def add_companies(count, role, users_per_company=2):
+    start = Company.objects.count()
+    for index in range(start, start + count):
+        company = Company.objects.create(
+            name=f'Empresa {index}', domain=f'empresa{index}.com', rubro='otros', pais='PE'
+        )
+        add_users(company, role, users_per_company)
+
+
+def add_users(company, role, count, prefix='usuario'):
+    start = User.objects.count()
+    for index in range(start, start + count):
+        User.objects.create_user(
+            email=f'{prefix}{index}@{company.domain}', password=PASSWORD,
+            first_name=f'Usuario {index}', last_name='Test',
+            company=company, role=role,
+        )
+
+
+def add_shipments(product, user, count, inspections_per_shipment=3, samples_per_inspection=2):
+    start = Shipment.objects.count()
+    for index in range(start, start + count):
+        shipment = Shipment.objects.create(
+            reference=f'REF-{index:05d}', product=product, shipper='Expedidor',
+            consignee='Consignatario', transport_type='sea', location='Callao',
+            date=date.today() - timedelta(days=index), created_by=user,
+        )
+        add_inspections(shipment, inspections_per_shipment, samples_per_inspection)
+
+
+def add_inspections(shipment, count, samples_per_inspection=2):
+    now = timezone.now()
+    statuses = [choice for choice, _ in Inspection.STATUS_CHOICES]
+    start = shipment.inspections.count()
+    for number in range(start, start + count):
+        inspection = Inspection.objects.create(
+            shipment=shipment, inspection_type='quality',
+            status=statuses[(shipment.id + number) % len(statuses)],
+            inspection_point='Planta', inspector='Inspector',
+            inspection_date=now - timedelta(hours=shipment.id * 10 + number),
+        )
+        QualityReport.objects.create(
+            inspection=inspection, temperature='2.50', overall_quality='good', approved=True
+        )
+        for sample in range(samples_per_inspection):
+            Sample.objects.create(
+                inspection=inspection, sample_id=f'M-{inspection.id}-{sample}',
+                quantity='1.50', location_taken='Cámara',
+            )
+
+
+def add_quality_data(company, count):
+    now = timezone.now()
+    start = QualityData.objects.count()
+    for index in range(start, start + count):
+        QualityData.objects.create(
+            empresa=company.name,
+            company=company,
+            fecha_registro=now - timedelta(hours=index),
+            temperatura='1.50',
+            ph='3.20',
+            calidad_general=QualityData.CALIDAD_CHOICES[index % 4][0],
+            aprobado=index % 2 == 0,
+            processed_data={
+                'additional_info': {
+                    'destino': 'USA', 'variedad': 'BILOXI', 'n_fcl': f'FCL{index}',
+                    'total_exportable': 92.5,
+                }
+            },
+        )
+
+
+def create_benchmark_rows(empresa, rows, seed=42):
+    """Crea registros QualityData sintéticos para los benchmarks"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    objects = []
+    for index in range(rows):
+        total_exportable = round(rng.uniform(80, 100), 2)
+        objects.append(QualityData(
+            empresa=empresa,
+            fecha_registro=now - timedelta(minutes=index),
+            temperatura=round(rng.uniform(0, 5), 2),
+            humedad=round(rng.uniform(80, 95), 2),
+            solidos_solubles=round(rng.uniform(10, 16), 2),
+            acidez_titulable=round(rng.uniform(0.3, 1.2), 2),
+            defectos_porcentaje=round(100 - total_exportable, 2),
+            calidad_general=rng.choice(QualityData.CALIDAD_CHOICES)[0],
+            aprobado=total_exportable >= 90,
+            processed_data={
+                'additional_info': {
+                    'destino': rng.choice(['USA', 'EUROPA', 'CHINA']),
+                    'variedad': rng.choice(['BILOXI', 'VENTURA', 'EMERALD']),
+                    'presentacion': '12x125g',
+                    'tipo_producto': 'CONVENCIONAL',
+                    'total_exportable': total_exportable,
+                    'evaluador': f'EVALUADOR {index % 7}',
+                    'fundo': f'FUNDO {index % 5}',
+                    'hora': '08:30',
+                    'n_fcl': f'FCL{index // 20:05d}',
+                    'productor': empresa,
+                    'fecha_mp': now.date().isoformat(),
+                    'fecha_proceso': now.date().isoformat(),
+                }
+            }
+        ))
+    QualityData.objects.bulk_create(objects, batch_size=1000)
@@ -0,0 +1,209 @@
+"""
+Métricas por endpoint en formato Prometheus.
+
+Cada proceso (worker de gunicorn) acumula sus métricas en memoria y las vuelca
+periódicamente a un archivo JSON propio dentro de METRICS_DIR. El endpoint
+/api/metrics combina los archivos de todos los workers, de forma similar al
+modo multiproceso de prometheus_client.
+"""
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Mismo valor por defecto que settings.METRICS_DIR
+DEFAULT_METRICS_DIR = os.path.join(tempfile.gettempdir(), 'agro_metrics')
+
+
+def _empty_metrics():
+    return {
+        'requests': {},
+        'latency': {},
+        'queries': {},
+        'response_bytes': {},
+    }
+
+
+def _key(*labels):
+    return '\x1f'.join(labels)
+
+
+def _labels(key):
+    return key.split('\x1f')
+
+
+class MetricsRegistry:
+    """
+    Acumulador de métricas del proceso actual
+    """
+
+    def __init__(self, directory, flush_interval=5.0):
+        self.directory = str(directory)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._metrics = _empty_metrics()
+        self._last_flush = 0.0
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+
+    def observe(self, endpoint, method, status, duration, queries, query_time, size):
+        """Registra una petición terminada"""
+        with self._lock:
+            metrics = self._metrics
+
+            key = _key(endpoint, method, str(status))
+            metrics['requests'][key] = metrics['requests'].get(key, 0) + 1
+
+            key = _key(endpoint, method)
+            latency = metrics['latency'].get(key)
+            if latency is None:
+                latency = metrics['latency'][key] = {
+                    'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0
+                }
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    latency['buckets'][index] += 1
+            latency['sum'] += duration
+            latency['count'] += 1
+
+            key = _key(endpoint)
+            totals = metrics['queries'].setdefault(key, [0, 0.0])
+            totals[0] += queries
+            totals[1] += query_time
+
+            if size is not None:
+                metrics['response_bytes'][key] = metrics['response_bytes'].get(key, 0) + size
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Vuelca las métricas del proceso a su archivo (escritura atómica)"""
+        with self._lock:
+            payload = json.dumps(self._metrics)
+            self._last_flush = time.monotonic()
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as handle:
+                handle.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ No se pudieron guardar las métricas: {e}")
+
+    def collect(self):
+        """Combina las métricas de todos los workers"""
+        self.flush()
+        merged = _empty_metrics()
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+            try:
+                with open(path) as handle:
+                    metrics = json.load(handle)
+            except (OSError, ValueError):
+                continue
+
+            for key, value in metrics['requests'].items():
+                merged['requests'][key] = merged['requests'].get(key, 0) + value
+
+            for key, value in metrics['latency'].items():
+                latency = merged['latency'].setdefault(
+                    key, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+                )
+                latency['buckets'] = [a + b for a, b in zip(latency['buckets'], value['buckets'])]
+                latency['sum'] += value['sum']
+                latency['count'] += value['count']
+
+            for key, (count, seconds) in metrics['queries'].items():
+                totals = merged['queries'].setdefault(key, [0, 0.0])
+                totals[0] += count
+                totals[1] += seconds
+
+            for key, value in metrics['response_bytes'].items():
+                merged['response_bytes'][key] = merged['response_bytes'].get(key, 0) + value
+
+        return merged
+
+    def render(self):
+        """Retorna las métricas combinadas en formato de texto Prometheus"""
+        metrics = self.collect()
+        lines = []
+
+        lines.append('# HELP agro_http_requests_total Peticiones HTTP por endpoint, método y estado')
+        lines.append('# TYPE agro_http_requests_total counter')
+        for key, value in sorted(metrics['requests'].items()):
+            endpoint, method, status = _labels(key)
+            lines.append(
+                f'agro_http_requests_total{_format_labels(endpoint=endpoint, method=method, status=status)} {value}'
+            )
+
+        lines.append('# HELP agro_http_request_duration_seconds Latencia de las peticiones HTTP')
+        lines.append('# TYPE agro_http_request_duration_seconds histogram')
+        for key, latency in sorted(metrics['latency'].items()):
+            endpoint, method = _labels(key)
+            for bound, count in zip(LATENCY_BUCKETS, latency['buckets']):
+                labels = _format_labels(endpoint=endpoint, method=method, le=repr(bound))
+                lines.append(f'agro_http_request_duration_seconds_bucket{labels} {count}')
+            labels = _format_labels(endpoint=endpoint, method=method, le='+Inf')
+            lines.append(f'agro_http_request_duration_seconds_bucket{labels} {latency["count"]}')
+            labels = _format_labels(endpoint=endpoint, method=method)
+            lines.append(f'agro_http_request_duration_seconds_sum{labels} {latency["sum"]}')
+            lines.append(f'agro_http_request_duration_seconds_count{labels} {latency["count"]}')
+
+        lines.append('# HELP agro_db_queries_total Consultas SQL ejecutadas por endpoint')
+        lines.append('# TYPE agro_db_queries_total counter')
+        for key, (count, _) in sorted(metrics['queries'].items()):
+            lines.append(f'agro_db_queries_total{_format_labels(endpoint=_labels(key)[0])} {count}')
+
+        lines.append('# HELP agro_db_query_duration_seconds_total Tiempo en consultas SQL por endpoint')
+        lines.append('# TYPE agro_db_query_duration_seconds_total counter')
+        for key, (_, seconds) in sorted(metrics['queries'].items()):
+            lines.append(f'agro_db_query_duration_seconds_total{_format_labels(endpoint=_labels(key)[0])} {seconds}')
+
+        lines.append('# HELP agro_http_response_size_bytes_total Bytes de respuesta enviados por endpoint')
+        lines.append('# TYPE agro_http_response_size_bytes_total counter')
+        for key, value in sorted(metrics['response_bytes'].items()):
+            lines.append(f'agro_http_response_size_bytes_total{_format_labels(endpoint=_labels(key)[0])} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(**labels):
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+_registry = None
+
+
+def get_registry():
+    """Retorna el registro de métricas del proceso actual"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(
+            getattr(settings, 'METRICS_DIR', DEFAULT_METRICS_DIR),
+            getattr(settings, 'METRICS_FLUSH_INTERVAL', 5.0),
+        )
+    return _registry
+
+
+def clear_metrics_dir(directory):
+    """Elimina los archivos de métricas de ejecuciones anteriores"""
+    for path in glob.glob(os.path.join(str(directory), 'metrics_*.json')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
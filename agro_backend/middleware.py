@@ -0,0 +1,222 @@
+"""
+Middleware propios del proyecto
+"""
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .db_router import pin_to_primary, unpin
+from .metrics import get_registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'text/',
+)
+
+
+def _accepted_encodings(header):
+    """Retorna las codificaciones aceptadas (q > 0) del header Accept-Encoding"""
+    accepted = set()
+    for item in header.split(','):
+        parts = [part.strip() for part in item.split(';')]
+        coding = parts[0].lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class _GzipStream:
+    """Compresor gzip incremental"""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    """Compresor brotli incremental"""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresión de respuestas con brotli (si el cliente lo soporta y el paquete
+    está instalado) o gzip.
+
+    - Las respuestas normales se comprimen sólo si superan COMPRESSION_MIN_LENGTH.
+    - Las respuestas en streaming se comprimen de forma incremental, chunk a chunk,
+      sin cargar todo el contenido en memoria.
+    - Los niveles por defecto (gzip 5, brotli 4) priorizan CPU sobre el último
+      punto de ratio; se ajustan con COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY.
+    """
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 5)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self._select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = self._compress_stream(
+                encoding, response.streaming_content
+            )
+            # El tamaño final no se conoce hasta terminar el streaming
+            del response.headers['Content-Length']
+        else:
+            stream = self._new_stream(encoding)
+            compressed = stream.compress(response.content) + stream.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Un ETag fuerte deja de ser válido tras comprimir (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _select_encoding(self, header):
+        accepted = _accepted_encodings(header)
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted or '*' in accepted:
+            return 'gzip'
+        return None
+
+    def _new_stream(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _compress_stream(self, encoding, chunks):
+        stream = self._new_stream(encoding)
+        for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+
+class _QueryCounter:
+    """execute_wrapper que cuenta consultas SQL y su tiempo total"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Registra por nombre de URL: latencia, número y tiempo de consultas SQL,
+    tamaño de respuesta y códigos de estado. Se expone en /api/metrics
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+
+        get_registry().observe(
+            endpoint, request.method, response.status_code,
+            duration, counter.count, counter.duration, size,
+        )
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Con réplica (agro_backend.db_router): las peticiones que no son
+    GET/HEAD/OPTIONS leen siempre de 'default' (p. ej. el objeto que se va a
+    actualizar); las demás, desde su primera escritura. El estado se limpia
+    al terminar cada petición
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            unpin()
+        else:
+            pin_to_primary()
+        try:
+            return self.get_response(request)
+        finally:
+            unpin()
@@ -0,0 +1,120 @@
+"""
+Backend PostgreSQL para workers gevent.
+
+- psycogreen hace cooperativa la E/S de psycopg2: mientras una consulta
+  espera al servidor, el worker atiende otras peticiones
+- Con gevent cada greenlet (petición) tiene su propia conexión, así que
+  CONN_MAX_AGE no sirve para reutilizarlas. ConnectionPool las guarda por
+  proceso: al cerrar, la conexión vuelve al pool en lugar de cerrarse, y
+  `pool_size` acota cuántas hay abiertas a la vez (workers x pool_size debe
+  quedar por debajo de max_connections del servidor)
+
+OPTIONS admite además `pool_size` y `pool_timeout` (segundos de espera por
+una conexión libre); el resto se pasa a psycopg2.
+"""
+import threading
+
+import gevent.monkey
+from django.db import OperationalError
+from django.db.backends.postgresql import base as postgresql_base
+from psycogreen.gevent import patch_psycopg
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+if gevent.monkey.is_module_patched('socket'):
+    patch_psycopg()
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 30
+
+
+class ConnectionPool:
+    """
+    Conexiones de un proceso a una base: como mucho `size` en uso; las
+    devueltas quedan inactivas para la siguiente petición (LIFO)
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self, connect):
+        """Conexión inactiva o nueva (`connect()`); espera si las `size` están en uso"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(f'Sin conexiones libres en el pool tras {self.timeout} s')
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return connect()
+                if not connection.closed:
+                    return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        try:
+            if not discard and not connection.closed:
+                if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                with self._lock:
+                    self._idle.append(connection)
+                return
+            connection.close()
+        except Exception:
+            connection.close()
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+_pools_lock = threading.Lock()
+_pools = {}
+
+
+def get_connection_pool(key, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+    """Pool del proceso para la base identificada por `key`"""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size, timeout)
+        return _pools[key]
+
+
+class DatabaseWrapper(postgresql_base.DatabaseWrapper):
+
+    @property
+    def connection_pool(self):
+        settings_dict = self.settings_dict
+        options = settings_dict['OPTIONS']
+        key = (settings_dict['HOST'], settings_dict['PORT'], settings_dict['NAME'], settings_dict['USER'])
+        return get_connection_pool(
+            key,
+            options.get('pool_size', DEFAULT_POOL_SIZE),
+            options.get('pool_timeout', DEFAULT_POOL_TIMEOUT),
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool_size', None)
+        params.pop('pool_timeout', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        return self.connection_pool.acquire(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            # Tras un error la conexión puede haber quedado inservible: no se reutiliza
+            discard = self.errors_occurred and not self.is_usable()
+            with self.wrap_database_errors:
+                return self.connection_pool.release(self.connection, discard=discard)
@@ -0,0 +1,34 @@
+"""
+Renderers de la API basados en orjson
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Reemplazo de JSONRenderer usando orjson.
+
+    datetime/date se serializan de forma nativa con el mismo formato que el
+    encoder de DRF (ISO 8601, 'Z' para UTC). Para el resto de tipos (Decimal,
+    timedelta, UUID, lazy strings...) se usa el encoder de DRF como fallback,
+    por lo que los Decimal crudos siguen saliendo como float y los campos
+    DecimalField de los serializers como string, igual que antes.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        option = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=option)
+
+        # Igual que JSONRenderer: escapar separadores de línea no válidos en JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
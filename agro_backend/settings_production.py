@@ -3,6 +3,8 @@ Django settings for agro_backend project - Production configuration.
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -43,7 +45,9 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'agro_backend.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'agro_backend.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,14 +77,63 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'agro_backend.wsgi.application'
 
-# Database - PostgreSQL para producción
-DATABASES = {
+# Database - PostgreSQL para producción si las variables están disponibles, SQLite por defecto
+if os.getenv('POSTGRES_DB'):
+    # PostgreSQL: conexiones en pool por worker y E/S cooperativa con gevent
+    # (agro_backend.postgresql_backend). Varios workers escriben a la vez
+    DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'ENGINE': 'agro_backend.postgresql_backend',
+            'NAME': os.getenv('POSTGRES_DB', 'agro_db'),
+            'USER': os.getenv('POSTGRES_USER', 'agro_user'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'agro_password_secure_2024'),
+            'HOST': os.getenv('POSTGRES_HOST', 'db'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0,  # Al terminar la petición la conexión vuelve al pool
+            'OPTIONS': {
+                'pool_size': int(os.getenv('POSTGRES_POOL_SIZE', '10')),
+                'pool_timeout': 30,
+                'connect_timeout': 10,
+            },
+        }
+    }
+else:
+    # SQLite en WAL: lectores concurrentes, escrituras en cola por proceso (ver sqlite_gevent)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'agro_backend.sqlite_backend',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 30,
+                'pool_size': 8,
+            }
         }
     }
 
+# Réplica de solo lectura para las apps de datos (agro_backend.db_router.ReplicaRouter).
+# Se activa por despliegue: PostgreSQL con POSTGRES_REPLICA_HOST, SQLite con
+# SQLITE_REPLICA_PATH (o la misma base) abierta en solo lectura
+DATABASE_REPLICA_ENABLED = config('DATABASE_REPLICA_ENABLED', default=False, cast=bool)
+DATABASE_REPLICA_APPS = ('quality_data', 'production')
+if DATABASE_REPLICA_ENABLED:
+    replica = {**DATABASES['default'], 'OPTIONS': dict(DATABASES['default']['OPTIONS'])}
+    if os.getenv('POSTGRES_DB'):
+        replica['HOST'] = os.getenv('POSTGRES_REPLICA_HOST', replica['HOST'])
+        replica['PORT'] = os.getenv('POSTGRES_REPLICA_PORT', replica['PORT'])
+    else:
+        replica['NAME'] = f"file:{os.getenv('SQLITE_REPLICA_PATH', replica['NAME'])}?mode=ro"
+    # En tests la réplica es la misma base de pruebas
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica'] = replica
+    DATABASE_ROUTERS = ['agro_backend.db_router.ReplicaRouter']
+    MIDDLEWARE.insert(1, 'agro_backend.middleware.ReplicaPinningMiddleware')
+elif sys.argv[1:2] == ['test']:
+    # manage.py test: 'replica' como espejo de la base de pruebas para los tests
+    # del router (agro_backend.tests), que activan el router y el middleware
+    DATABASES['replica'] = {
+        **DATABASES['default'], 'OPTIONS': dict(DATABASES['default']['OPTIONS']), 'TEST': {'MIRROR': 'default'},
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -118,6 +171,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
 
+# El login carga usuario, empresa y rol con una sola consulta
+AUTHENTICATION_BACKENDS = ['apps.authentication.backends.SessionUserBackend']
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
@@ -130,13 +186,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'agro_backend.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'agro_backend.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
@@ -160,6 +221,8 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # Relee empresa y rol al refrescar (claims usados por ClaimsJWTAuthentication)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.tokens.CompanyTokenRefreshSerializer',
 }
 
 # CORS settings para producción
@@ -167,6 +230,32 @@ CORS_ALLOWED_ORIGINS = ["http://34.136.15.241:3000","http://localhost:3000","htt
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Compresión de respuestas (agro_backend.middleware.CompressionMiddleware)
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_GZIP_LEVEL = 5
+COMPRESSION_BROTLI_QUALITY = 4
+
+# Métricas por endpoint (agro_backend.middleware.MetricsMiddleware, /api/metrics)
+# Por defecto fuera del código (puede ser de solo lectura); cada worker escribe su archivo
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'agro_metrics'))
+METRICS_FLUSH_INTERVAL = 5.0
+
+# Mapa nombre de empresa -> id en memoria (apps.authentication.company_resolver).
+# Se invalida al guardar una Company; en otros workers expira tras este TTL
+COMPANY_RESOLVER_TTL = 60.0
+
+# Estadísticas del dashboard de producción en caché (apps.production.dashboard).
+# Se invalidan al escribir Shipment/Inspection/Product; en otros workers expiran tras este TTL
+DASHBOARD_STATS_CACHE_TTL = 30
+
+# Máximo de elementos por POST en los endpoints de creación masiva (agro_backend.bulk)
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Caché por proceso de usuario + company + role para la autenticación JWT
+# (apps.authentication.authentication.CachedJWTAuthentication)
+AUTH_USER_CACHE_TTL = 30.0
+AUTH_USER_CACHE_SIZE = 1024
+
 # Configuraciones de seguridad para producción
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
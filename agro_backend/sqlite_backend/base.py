@@ -0,0 +1,119 @@
+"""
+Backend SQLite para workers gevent: conexiones reutilizadas (ConnectionPool),
+lecturas concurrentes en WAL y escrituras en la cola del proceso (WriteQueue).
+Ver sqlite_gevent para el detalle.
+
+OPTIONS admite además `pool_size`: conexiones inactivas que se conservan por proceso
+"""
+from django.db.backends.sqlite3 import base as sqlite3_base
+
+from sqlite_gevent import (
+    DEFAULT_POOL_SIZE, configure_connection, get_connection_pool, get_write_queue,
+    is_write_statement,
+)
+
+
+class SQLiteCursorWrapper(sqlite3_base.SQLiteCursorWrapper):
+    """
+    Fuera de una transacción, cada sentencia de escritura toma el turno de
+    escritura solo mientras se ejecuta; dentro, ya lo tiene la transacción
+    """
+    write_queue = None
+    write_timeout = None
+
+    def execute(self, query, params=None):
+        if self.write_queue is None or self.connection.in_transaction or not is_write_statement(query):
+            return super().execute(query, params)
+        with self.write_queue.turn(self.write_timeout):
+            return super().execute(query, params)
+
+    def executemany(self, query, param_list):
+        if self.write_queue is None or self.connection.in_transaction or not is_write_statement(query):
+            return super().executemany(query, param_list)
+        with self.write_queue.turn(self.write_timeout):
+            return super().executemany(query, param_list)
+
+
+class DatabaseWrapper(sqlite3_base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._holds_write_turn = False
+
+    @property
+    def shared(self):
+        """Pool y cola solo para bases en archivo (la de tests vive en memoria)"""
+        return not self.is_in_memory_db()
+
+    @property
+    def connection_pool(self):
+        options = self.settings_dict['OPTIONS']
+        return get_connection_pool(str(self.settings_dict['NAME']), options.get('pool_size', DEFAULT_POOL_SIZE))
+
+    @property
+    def write_queue(self):
+        return get_write_queue(str(self.settings_dict['NAME']))
+
+    @property
+    def write_timeout(self):
+        return self.settings_dict['OPTIONS'].get('timeout', 5)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool_size', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        if self.shared:
+            connection = self.connection_pool.acquire()
+            if connection is not None:
+                return connection
+        return configure_connection(super().get_new_connection(conn_params))
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=SQLiteCursorWrapper)
+        if self.shared:
+            cursor.write_queue = self.write_queue
+            cursor.write_timeout = self.write_timeout
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        # Las transacciones (atomic) escriben: se toma el turno y el lock de
+        # escritura de SQLite al empezar, no a mitad de la transacción
+        if not self.shared:
+            return super()._start_transaction_under_autocommit()
+        self._acquire_write_turn()
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self._release_write_turn()
+            raise
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_turn()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_turn()
+
+    def _close(self):
+        self._release_write_turn()
+        if self.connection is not None and self.shared:
+            with self.wrap_database_errors:
+                return self.connection_pool.release(self.connection)
+        return super()._close()
+
+    def _acquire_write_turn(self):
+        if not self._holds_write_turn:
+            self.write_queue.acquire(self.write_timeout)
+            self._holds_write_turn = True
+
+    def _release_write_turn(self):
+        if self._holds_write_turn:
+            self._holds_write_turn = False
+            self.write_queue.release()
@@ -0,0 +1,65 @@
+"""
+Utilidades compartidas por los tests de presupuesto de consultas (query budget)
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+
+from apps.authentication.authentication import get_user_context_cache
+from apps.authentication.tokens import CompanyRefreshToken
+from .fixtures import (
+    PASSWORD, add_companies, add_inspections, add_quality_data, add_shipments, add_users, seed_dataset,
+)
+
+# Tamaños de página con los que se ejecuta cada lista paginada
+PAGE_SIZES = (2, 10)
+
+
+# Hasher rápido: el dataset crea decenas de usuarios
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTestCase(APITestCase):
+    """
+    Caso base: autentica con JWT real (con el contexto del usuario ya en
+    caché, como en estado estable) y expone aserciones de presupuesto
+    """
+    rows = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(cls.rows)
+
+    def setUp(self):
+        # Las cachés de respuestas (p. ej. dashboard) no sobreviven entre tests
+        cache.clear()
+        self.authenticate(self.data['admin'])
+
+    def authenticate(self, user):
+        token = CompanyRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Estado estable: el contexto del usuario ya está en caché
+        get_user_context_cache().clear()
+        get_user_context_cache().get_or_load(user.id)
+
+    def assertQueryBudget(self, budget, url, method='get', data=None, status=200):
+        """La petición debe ejecutar exactamente `budget` consultas"""
+        with self.assertNumQueries(budget):
+            response = getattr(self.client, method)(url, data=data, format='json')
+        self.assertEqual(response.status_code, status, getattr(response, 'data', None))
+        return response
+
+    def assertPaginatedBudget(self, budget, url, page_sizes=PAGE_SIZES):
+        """El mismo presupuesto para todos los tamaños de página"""
+        for page_size in page_sizes:
+            with self.subTest(page_size=page_size), \
+                    mock.patch.object(PageNumberPagination, 'page_size', page_size):
+                response = self.assertQueryBudget(budget, url)
+                self.assertEqual(len(response.data['results']), page_size)
+
+    def assertConstantBudget(self, budget, url, grow, **kwargs):
+        """El mismo presupuesto antes y después de `grow()` (que agrega filas)"""
+        self.assertQueryBudget(budget, url, **kwargs)
+        grow()
+        self.assertQueryBudget(budget, url, **kwargs)
@@ -0,0 +1,372 @@
+"""
+Tests de la infraestructura de agro_backend: backends de base de datos, réplica
+de lectura, renderer/parser JSON, compresión y métricas
+"""
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from agro_backend import metrics
+from agro_backend.db_router import REPLICA_DB_ALIAS, ReplicaRouter, unpin
+from agro_backend.middleware import CompressionMiddleware, ReplicaPinningMiddleware, brotli
+from agro_backend.parsers import ORJSONParser
+from agro_backend.renderers import ORJSONRenderer
+from agro_backend.sqlite_backend.base import DatabaseWrapper
+from agro_backend.testing import QueryBudgetTestCase, seed_dataset
+from apps.authentication.models import User
+from apps.authentication.tokens import CompanyRefreshToken
+from apps.production.models import Shipment
+from apps.quality_data.models import QualityData
+from sqlite_gevent import get_connection_pool
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Backend SQLite')
+class SQLiteBackendTests(SimpleTestCase):
+    """agro_backend.sqlite_backend sobre una base en archivo (la de tests vive en memoria)"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        name = os.path.join(directory, 'db.sqlite3')
+        self.addCleanup(lambda: get_connection_pool(name).close_all())
+        self.settings_dict = {
+            **connection.settings_dict, 'NAME': name, 'OPTIONS': {'timeout': 0.2, 'pool_size': 2},
+        }
+        self.open().cursor().execute('CREATE TABLE lectura (id INTEGER PRIMARY KEY, valor INTEGER)')
+
+    def open(self):
+        wrapper = DatabaseWrapper(self.settings_dict, alias='sqlite_pool')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def count(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM lectura')
+            return cursor.fetchone()[0]
+
+    def begin(self, wrapper):
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        wrapper.cursor().execute('INSERT INTO lectura (valor) VALUES (1)')
+
+    def test_wal_without_exclusive_locking(self):
+        with self.open().cursor() as cursor:
+            self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(cursor.execute('PRAGMA locking_mode').fetchone()[0], 'normal')
+
+    def test_readers_not_blocked_by_writer(self):
+        writer, reader = self.open(), self.open()
+        self.begin(writer)
+        self.assertEqual(self.count(reader), 0)
+        writer.commit()
+        self.assertEqual(self.count(reader), 1)
+
+    def test_writes_wait_for_the_write_turn(self):
+        writer, other = self.open(), self.open()
+        self.begin(writer)
+        with self.assertRaises(OperationalError):
+            other.cursor().execute('INSERT INTO lectura (valor) VALUES (2)')
+        writer.commit()
+        other.cursor().execute('INSERT INTO lectura (valor) VALUES (2)')
+        self.assertEqual(self.count(other), 2)
+
+    def test_closed_connections_are_reused(self):
+        first = self.open()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        second = self.open()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Backend PostgreSQL')
+class PostgresBackendTests(SimpleTestCase):
+    """agro_backend.postgresql_backend contra el PostgreSQL de POSTGRES_*"""
+    databases = {'default'}
+
+    def test_postgres_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, QualityData._meta.db_table)
+        self.assertEqual(constraints['quality_dat_process_gin']['type'], 'gin')
+        self.assertEqual(constraints['quality_dat_fecha_brin']['type'], 'brin')
+
+    def test_closed_connections_are_reused(self):
+        from agro_backend.postgresql_backend.base import DatabaseWrapper
+
+        first = DatabaseWrapper({**connection.settings_dict}, alias='postgres_pool')
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        second = DatabaseWrapper({**connection.settings_dict}, alias='postgres_pool')
+        self.addCleanup(second.close)
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+
+
+@override_settings(DATABASE_REPLICA_APPS=('quality_data', 'production'))
+class ReplicaRouterTests(SimpleTestCase):
+    """agro_backend.db_router.ReplicaRouter y su middleware"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        unpin()
+        self.addCleanup(unpin)
+
+    def routed_read(self, method):
+        """Alias de lectura de QualityData durante una petición `method`, antes y después de escribir"""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(QualityData))
+            self.router.db_for_write(QualityData)
+            seen.append(self.router.db_for_read(QualityData))
+            return None
+
+        ReplicaPinningMiddleware(view)(getattr(RequestFactory(), method)('/api/quality-data/'))
+        return seen
+
+    def test_reads_of_data_apps_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(QualityData), 'replica')
+        self.assertEqual(self.router.db_for_read(Shipment), 'replica')
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertEqual(self.router.db_for_write(QualityData), 'default')
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        self.assertEqual(self.routed_read('get'), ['replica', None])
+        # El estado no pasa a la siguiente petición
+        self.assertEqual(self.router.db_for_read(QualityData), 'replica')
+
+    def test_unsafe_methods_read_from_primary(self):
+        self.assertEqual(self.routed_read('post'), [None, None])
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'quality_data'))
+        self.assertIsNone(self.router.allow_migrate('default', 'quality_data'))
+
+
+REPLICA_MIDDLEWARE = 'agro_backend.middleware.ReplicaPinningMiddleware'
+
+
+@override_settings(
+    DATABASE_REPLICA_APPS=('quality_data', 'production'),
+    DATABASE_ROUTERS=['agro_backend.db_router.ReplicaRouter'],
+    MIDDLEWARE=[settings.MIDDLEWARE[0], REPLICA_MIDDLEWARE]
+    + [name for name in settings.MIDDLEWARE[1:] if name != REPLICA_MIDDLEWARE],
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ReplicaRequestTests(TransactionTestCase):
+    """
+    Peticiones reales con la réplica activa. Es un TransactionTestCase: dentro
+    de la transacción de un TestCase el router siempre lee de 'default'
+    """
+    databases = {'default', REPLICA_DB_ALIAS}
+
+    def setUp(self):
+        self.data = seed_dataset(2)
+        token = CompanyRefreshToken.for_user(self.data['admin']).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        self.url = reverse('quality_data:quality-data-list')
+
+    def request(self, method, url, data=None):
+        """Retorna (respuesta, SQL en 'default', SQL en la réplica)"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica:
+            response = getattr(self.client, method)(url, data=data, content_type='application/json')
+        return response, [query['sql'] for query in primary], [query['sql'] for query in replica]
+
+    def test_get_reads_from_replica(self):
+        response, primary, replica = self.request('get', self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(any(QualityData._meta.db_table in sql for sql in replica))
+        self.assertFalse(any(QualityData._meta.db_table in sql for sql in primary))
+
+    def test_post_and_its_reads_use_primary(self):
+        record = QualityData.objects.filter(company=self.data['company']).first()
+        url = reverse('quality_data:quality-data-detail', args=[record.pk])
+        response, primary, replica = self.request('post', self.url, {
+            'empresa': self.data['company'].name, 'fecha_registro': '2024-01-01T00:00:00Z',
+            'calidad_general': 'buena', 'aprobado': True,
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(replica, [])
+        self.assertTrue(any(sql.startswith('INSERT') for sql in primary))
+
+        # Una lectura después de escribir en la misma petición: el PATCH
+        # lee el registro, lo guarda y lo vuelve a leer, todo en 'default'
+        response, primary, replica = self.request('patch', url, {'aprobado': False})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(replica, [])
+        self.assertTrue(any(sql.startswith('UPDATE') for sql in primary))
+
+        # El pin no pasa a la siguiente petición
+        response, primary, replica = self.request('get', self.url)
+        self.assertEqual(response.data['count'], 3)
+        self.assertTrue(any(QualityData._meta.db_table in sql for sql in replica))
+
+
+class ORJSONTests(SimpleTestCase):
+    """ORJSONRenderer produce lo mismo que JSONRenderer y ORJSONParser lo lee de vuelta"""
+
+    data = {
+        'decimal': Decimal('1.50'),
+        'utc': datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+        'offset': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5))),
+        'naive': datetime(2024, 1, 2, 3, 4, 5),
+        'date': date(2024, 1, 2),
+        'duration': timedelta(minutes=90),
+        1: 'clave numérica',
+        'texto': 'línea\u2028separada',
+    }
+
+    def test_render_matches_drf(self):
+        rendered = ORJSONRenderer().render(self.data)
+        self.assertEqual(rendered, JSONRenderer().render(self.data))
+        self.assertIn(b'"2024-01-02T03:04:05.123456Z"', rendered)
+        self.assertNotIn('\u2028'.encode(), rendered)
+
+    def test_round_trip(self):
+        parsed = ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render(self.data)))
+        self.assertEqual(parsed['decimal'], 1.5)
+        self.assertEqual(datetime.fromisoformat(parsed['utc'].replace('Z', '+00:00')), self.data['utc'])
+        self.assertEqual(datetime.fromisoformat(parsed['offset']), self.data['offset'])
+        self.assertEqual(parsed['1'], 'clave numérica')
+        self.assertEqual(parsed['texto'], self.data['texto'])
+
+    def test_parse_other_encoding_and_errors(self):
+        stream = io.BytesIO('{"empresa": "Agrícola"}'.encode('latin-1'))
+        self.assertEqual(
+            ORJSONParser().parse(stream, parser_context={'encoding': 'latin-1'}), {'empresa': 'Agrícola'}
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"empresa": '))
+
+
+@override_settings(COMPRESSION_MIN_LENGTH=200)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Negociación de Accept-Encoding y umbral de CompressionMiddleware"""
+
+    body = b'{"empresa": "Agro Test", "temperatura": "1.50"}' * 20
+
+    def respond(self, accept_encoding=None, response=None):
+        response = response or HttpResponse(self.body, content_type='application/json')
+        headers = {'HTTP_ACCEPT_ENCODING': accept_encoding} if accept_encoding is not None else {}
+        request = RequestFactory().get('/api/quality-data/', **headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    @skipUnless(brotli, 'brotli no instalado')
+    def test_prefers_brotli(self):
+        response = self.respond('gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_gzip_when_brotli_refused(self):
+        for header in ('gzip', 'br;q=0, gzip', '*'):
+            with self.subTest(header=header):
+                response = self.respond(header)
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_identity(self):
+        for header in ('', 'identity', 'gzip;q=0, br;q=0'):
+            with self.subTest(header=header):
+                response = self.respond(header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, self.body)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_below_threshold_and_other_content_types(self):
+        small = HttpResponse(self.body[:199], content_type='application/json')
+        response = self.respond('gzip', small)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+        image = HttpResponse(self.body, content_type='image/png')
+        self.assertFalse(self.respond('gzip', image).has_header('Content-Encoding'))
+
+    def test_strong_etag_becomes_weak(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond('gzip', response)['ETag'], 'W/"abc"')
+
+    def test_streaming(self):
+        chunks = [self.body[:10]] * 5
+        response = self.respond('gzip', StreamingHttpResponse(chunks, content_type='text/csv'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+
+class MetricsTests(QueryBudgetTestCase):
+    """MetricsRegistry combina los archivos de los workers y /api/metrics los expone en texto Prometheus"""
+    rows = 1
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.registry = metrics.MetricsRegistry(directory, flush_interval=3600)
+
+    def test_workers_are_merged(self):
+        self.registry.observe('quality_data:quality-data-list', 'GET', 200, 0.02, 3, 0.004, 1000)
+        # Otro worker: mismo directorio, otro pid
+        with mock.patch('agro_backend.metrics.os.getpid', return_value=0):
+            other = metrics.MetricsRegistry(self.registry.directory)
+            other.observe('quality_data:quality-data-list', 'GET', 200, 0.3, 2, 0.001, 500)
+            other.observe('quality_data:quality-data-list', 'GET', 304, 0.001, 1, 0.001, 0)
+            other.flush()
+
+        lines = self.registry.render().splitlines()
+        labels = 'endpoint="quality_data:quality-data-list",method="GET"'
+        for line in (
+            '# TYPE agro_http_requests_total counter',
+            f'agro_http_requests_total{{{labels},status="200"}} 2',
+            f'agro_http_requests_total{{{labels},status="304"}} 1',
+            '# TYPE agro_http_request_duration_seconds histogram',
+            f'agro_http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1',
+            f'agro_http_request_duration_seconds_bucket{{{labels},le="0.025"}} 2',
+            f'agro_http_request_duration_seconds_bucket{{{labels},le="0.25"}} 2',
+            f'agro_http_request_duration_seconds_bucket{{{labels},le="0.5"}} 3',
+            f'agro_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3',
+            f'agro_http_request_duration_seconds_count{{{labels}}} 3',
+            'agro_db_queries_total{endpoint="quality_data:quality-data-list"} 6',
+            'agro_http_response_size_bytes_total{endpoint="quality_data:quality-data-list"} 1500',
+        ):
+            self.assertIn(line, lines)
+
+    def test_labels_are_escaped(self):
+        self.registry.observe('ruta "rara"\\', 'GET', 404, 0.01, 0, 0.0, None)
+        self.assertIn(
+            'agro_http_requests_total{endpoint="ruta \\"rara\\"\\\\",method="GET",status="404"} 1',
+            self.registry.render().splitlines(),
+        )
+
+    def test_metrics_endpoint(self):
+        with mock.patch.object(metrics, '_registry', self.registry):
+            self.client.get(reverse('quality_data:quality-data-list'))
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn(
+            'agro_http_requests_total{endpoint="quality_data:quality-data-list",method="GET",status="200"} 1',
+            response.content.decode().splitlines(),
+        )
+
+        self.authenticate(User.objects.exclude(pk=self.data['admin'].pk).first())
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
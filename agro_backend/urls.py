@@ -6,8 +6,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from . import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics', views.metrics_view, name='metrics'),
     path('api/auth/', include('apps.authentication.urls')),
     path('api/', include('apps.production.urls')),
     path('api/', include('apps.quality_data.urls')),
@@ -0,0 +1,15 @@
+"""
+Vistas a nivel de proyecto
+"""
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+
+from apps.authentication.views import IsAdminUser
+from .metrics import CONTENT_TYPE, get_registry
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Métricas por endpoint en formato de texto Prometheus (solo administradores)"""
+    return HttpResponse(get_registry().render(), content_type=CONTENT_TYPE)
@@ -19,7 +19,7 @@ class CompanyAdmin(admin.ModelAdmin):
         }),
         ('Logo', {
             'fields': ('logo',),
-            'description': 'Sube el logo en formato Base64. Puedes usar herramientas online para convertir imágenes a Base64.'
+            'description': 'Sube el logo como archivo de imagen (JPEG, PNG, GIF o WEBP).'
         }),
         ('Información Adicional', {
             'fields': ('descripcion', 'activo')
@@ -32,14 +32,14 @@ class CompanyAdmin(admin.ModelAdmin):
     
     def users_count(self, obj):
         """Muestra el número de usuarios asociados a la empresa"""
-        count = obj.get_users_count()
+        count = obj.users_count
         return format_html('<span style="color: {};">{}</span>', 
                           'green' if count > 0 else 'red', count)
     users_count.short_description = 'Usuarios'
 
     def get_queryset(self, request):
-        """Optimizar consultas con select_related y prefetch_related"""
-        return super().get_queryset(request).prefetch_related('users')
+        """Conteo de usuarios anotado en SQL (sin cargar los usuarios)"""
+        return super().get_queryset(request).with_directory_stats()
 
 
 @admin.register(Role)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
+
+    def ready(self):
+        # Registra las señales de invalidación (resolvedor de empresas y
+        # caché de contexto de usuarios)
+        from . import authentication, company_resolver  # noqa: F401
@@ -0,0 +1,200 @@
+"""
+Autenticación JWT: con caché en memoria del contexto del usuario, o sin
+estado a partir de los claims de empresa y rol del token
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Company, Role, User
+from .tokens import COMPANY_ID_CLAIM, COMPANY_NAME_CLAIM, ROLE_CLAIM
+
+
+class UserContextCache:
+    """
+    LRU por proceso de usuarios con company y role ya cargados, indexado por id.
+    Cada entrada expira tras `ttl` segundos; los cambios hechos en este proceso
+    la invalidan de inmediato (señales de User, Company y Role)
+    """
+
+    def __init__(self, ttl=30.0, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_or_load(self, user_id):
+        """Retorna una copia del usuario (con company y role) o None si no existe"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return _snapshot(entry[1])
+
+        user = (
+            User.objects.select_related('company', 'role')
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is None:
+            return None
+
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return _snapshot(user)
+
+    def invalidate(self, user_id=None, company_id=None, role_id=None):
+        """Elimina las entradas del usuario, o de todos los usuarios de la empresa o rol"""
+        with self._lock:
+            for key, (_, user) in list(self._entries.items()):
+                if (
+                    (user_id is not None and key == user_id)
+                    or (company_id is not None and user.company_id == company_id)
+                    or (role_id is not None and user.role_id == role_id)
+                ):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _snapshot(user):
+    """
+    Copia independiente por request: las vistas pueden modificar request.user
+    (p. ej. update_profile) sin afectar a la entrada en caché
+    """
+    snapshot = copy.copy(user)
+    if user.company_id is not None:
+        snapshot.company = copy.copy(user.company)
+    if user.role_id is not None:
+        snapshot.role = copy.copy(user.role)
+    return snapshot
+
+
+_cache = None
+
+
+def get_user_context_cache():
+    """Retorna la caché de contexto de usuarios del proceso actual"""
+    global _cache
+    if _cache is None:
+        _cache = UserContextCache(
+            getattr(settings, 'AUTH_USER_CACHE_TTL', 30.0),
+            getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+        )
+    return _cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que obtiene el usuario (con company y role) desde
+    UserContextCache: en estado estable la identidad no cuesta consultas
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_user_context_cache().get_or_load(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuario construido solo con los claims del token. Basta para vistas que
+    solo acotan por empresa; no es una instancia de User (no sirve como FK)
+    """
+
+    @cached_property
+    def company_id(self):
+        return self.token.get(COMPANY_ID_CLAIM)
+
+    @cached_property
+    def company_name(self):
+        return self.token.get(COMPANY_NAME_CLAIM)
+
+    @cached_property
+    def role_name(self):
+        return self.token.get(ROLE_CLAIM)
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Autenticación sin consultas para lecturas que solo necesitan el scoping
+    por empresa. No revalida is_active ni cambios de empresa/rol: valen los claims
+    hasta que expira el access token. Los tokens emitidos sin claims de
+    empresa caen al camino con usuario completo de CachedJWTAuthentication
+    """
+
+    def get_user(self, validated_token):
+        if COMPANY_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
+
+
+class ClaimsReadAuthenticationMixin:
+    """
+    Para vistas con lectura y escritura: ClaimsJWTAuthentication en
+    GET/HEAD/OPTIONS y CachedJWTAuthentication en el resto, de modo que un
+    usuario desactivado o cambiado de empresa no puede seguir escribiendo
+    con un access token vigente
+    """
+
+    def get_authenticators(self):
+        if self.request.method in SAFE_METHODS:
+            return [ClaimsJWTAuthentication()]
+        return [CachedJWTAuthentication()]
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _invalidate_user(sender, instance, **kwargs):
+    get_user_context_cache().invalidate(user_id=instance.pk)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def _invalidate_company_users(sender, instance, **kwargs):
+    get_user_context_cache().invalidate(company_id=instance.pk)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def _invalidate_role_users(sender, instance, **kwargs):
+    get_user_context_cache().invalidate(role_id=instance.pk)
@@ -0,0 +1,28 @@
+"""
+Backend de autenticación del login
+"""
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+class SessionUserBackend(ModelBackend):
+    """
+    ModelBackend que carga el usuario con User.objects.for_session(): el login
+    obtiene usuario, empresa y rol con una sola consulta
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User.objects.for_session().get(**{User.USERNAME_FIELD: username})
+        except User.DoesNotExist:
+            # Mismo costo que con un usuario existente (igual que ModelBackend)
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
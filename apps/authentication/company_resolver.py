@@ -0,0 +1,81 @@
+"""
+Resolución de nombre de empresa -> Company.id en memoria.
+
+Se construye un mapa {nombre normalizado: id} con una sola consulta y se
+reutiliza por proceso. Se invalida al guardar o eliminar una Company en el
+mismo proceso; en los demás workers expira tras COMPANY_RESOLVER_TTL segundos.
+"""
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Company
+
+
+def normalize_company_name(name):
+    """'  Agro  Exportación S.A. ' -> 'agro exportacion s.a.'"""
+    if not name:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+
+class CompanyResolver:
+    """
+    Mapa de nombres normalizados a ids de Company. Ante nombres repetidos
+    gana el id menor (mismo criterio que la migración de company_id)
+    """
+
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._map = None
+        self._loaded_at = 0.0
+
+    def _get_map(self):
+        with self._lock:
+            if self._map is None or time.monotonic() - self._loaded_at >= self.ttl:
+                mapping = {}
+                for company_id, name in Company.objects.order_by('-id').values_list('id', 'name'):
+                    mapping[normalize_company_name(name)] = company_id
+                self._map = mapping
+                self._loaded_at = time.monotonic()
+            return self._map
+
+    def resolve(self, name):
+        """Retorna el id de la empresa con ese nombre (normalizado) o None"""
+        key = normalize_company_name(name)
+        if not key:
+            return None
+        return self._get_map().get(key)
+
+    def resolve_many(self, names):
+        """Resuelve un lote de nombres con a lo sumo una consulta: {nombre: id o None}"""
+        mapping = self._get_map()
+        return {name: mapping.get(normalize_company_name(name)) for name in names}
+
+    def invalidate(self):
+        with self._lock:
+            self._map = None
+
+
+_resolver = None
+
+
+def get_company_resolver():
+    """Retorna el resolvedor de empresas del proceso actual"""
+    global _resolver
+    if _resolver is None:
+        _resolver = CompanyResolver(getattr(settings, 'COMPANY_RESOLVER_TTL', 60.0))
+    return _resolver
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def _invalidate_company_resolver(sender, **kwargs):
+    get_company_resolver().invalidate()
@@ -0,0 +1,89 @@
+"""
+Procesamiento de imágenes al subirlas: normalización con Pillow y versiones
+de tamaño fijo (miniaturas) para logos y fotos de perfil
+"""
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Lado máximo (px) de cada versión; la mayor es la que guarda el campo
+IMAGE_SIZES = (64, 128, 512)
+
+FORMAT_EXTENSIONS = {'WEBP': '.webp', 'PNG': '.png'}
+SAVE_OPTIONS = {'WEBP': {'quality': 85}, 'PNG': {'optimize': True}}
+
+
+def open_image(file):
+    """Abre la imagen con Pillow aplicando la orientación EXIF. Lanza ValueError si no es válida"""
+    file.seek(0)
+    try:
+        with Image.open(file) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ValueError('El archivo no es una imagen válida') from error
+    finally:
+        file.seek(0)
+    return image
+
+
+def render_variants(file, sizes=IMAGE_SIZES, image_format='WEBP'):
+    """
+    Retorna {tamaño: ContentFile} re-codificados en `image_format`, sin
+    metadatos (EXIF, ICC, texto). Nunca se agranda la imagen original
+    """
+    image = open_image(file)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    image.info.clear()
+
+    extension = FORMAT_EXTENSIONS[image_format]
+    variants = {}
+    for size in sizes:
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, format=image_format, **SAVE_OPTIONS[image_format])
+        variants[size] = ContentFile(buffer.getvalue(), name=f'{size}{extension}')
+    return variants
+
+
+class ImageVariantsField(models.FileField):
+    """
+    FileField que procesa cada imagen nueva al guardar el modelo: el campo
+    apunta a la versión más grande y las demás se guardan junto a ella como
+    <nombre>-<tamaño><ext>. Requiere un storage con save_as (ContentAddressedStorage)
+    """
+
+    def __init__(self, *args, sizes=IMAGE_SIZES, image_format='WEBP', **kwargs):
+        self.sizes = tuple(sorted(sizes))
+        self.image_format = image_format
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.sizes != IMAGE_SIZES:
+            kwargs['sizes'] = self.sizes
+        if self.image_format != 'WEBP':
+            kwargs['image_format'] = self.image_format
+        return name, path, args, kwargs
+
+    def variant_name(self, name, size):
+        """Nombre del archivo de `size` px para la imagen guardada como `name`"""
+        if size >= self.sizes[-1]:
+            return name
+        stem, extension = posixpath.splitext(name)
+        return f'{stem}-{size}{extension}'
+
+    def pre_save(self, model_instance, add):
+        file = getattr(model_instance, self.attname)
+        if file and not file._committed:
+            variants = render_variants(file, self.sizes, self.image_format)
+            largest = variants.pop(self.sizes[-1])
+            file.save(f'imagen{FORMAT_EXTENSIONS[self.image_format]}', largest, save=False)
+            for size, content in variants.items():
+                self.storage.save_as(self.variant_name(file.name, size), content)
+        return super().pre_save(model_instance, add)
@@ -0,0 +1,92 @@
+import base64
+
+from django.db import migrations, models, transaction
+
+import apps.authentication.storage
+from apps.authentication.storage import decode_base64_image
+
+CHUNK_SIZE = 100
+
+# (modelo, campo Base64 anterior, campo de archivo, nombre base del archivo)
+IMAGE_FIELDS = (
+    ('Company', 'logo_base64', 'logo', 'logo'),
+    ('User', 'profile_image_base64', 'profile_image', 'avatar'),
+)
+
+
+def _chunked_ids(queryset):
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def move_images_to_storage(apps, schema_editor):
+    """Decodifica el Base64 de cada fila y lo guarda como archivo, por bloques"""
+    for model_name, base64_field, file_field, file_name in IMAGE_FIELDS:
+        model = apps.get_model('authentication', model_name)
+        pending = model.objects.exclude(**{f'{base64_field}__isnull': True}).exclude(**{base64_field: ''})
+        moved = skipped = 0
+        for ids in _chunked_ids(pending):
+            with transaction.atomic():
+                for instance in model.objects.filter(id__in=ids).only('id', base64_field):
+                    try:
+                        content = decode_base64_image(getattr(instance, base64_field), file_name)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    getattr(instance, file_field).save(content.name, content, save=False)
+                    model.objects.filter(id=instance.id).update(**{
+                        file_field: getattr(instance, file_field).name,
+                        base64_field: None,
+                    })
+                    moved += 1
+        print(f"🖼️ {model_name}.{file_field}: {moved} imágenes movidas a archivos, {skipped} inválidas descartadas")
+
+
+def move_images_to_database(apps, schema_editor):
+    """Reverso: vuelve a guardar cada archivo como Base64 en la fila"""
+    for model_name, base64_field, file_field, _ in IMAGE_FIELDS:
+        model = apps.get_model('authentication', model_name)
+        pending = model.objects.exclude(**{f'{file_field}__isnull': True}).exclude(**{file_field: ''})
+        for ids in _chunked_ids(pending):
+            with transaction.atomic():
+                for instance in model.objects.filter(id__in=ids).only('id', file_field):
+                    image = getattr(instance, file_field)
+                    with image.open('rb') as handle:
+                        encoded = base64.b64encode(handle.read()).decode('utf-8')
+                    model.objects.filter(id=instance.id).update(**{base64_field: encoded})
+
+
+class Migration(migrations.Migration):
+    # Cada bloque se confirma por separado: una tabla grande no queda en una sola transacción
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0004_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.RenameField(model_name='company', old_name='logo', new_name='logo_base64'),
+        migrations.RenameField(model_name='user', old_name='profile_image', new_name='profile_image_base64'),
+        migrations.AddField(
+            model_name='company',
+            name='logo',
+            field=models.FileField(
+                blank=True, max_length=255, null=True,
+                storage=apps.authentication.storage.ContentAddressedStorage(),
+                upload_to='logos/', verbose_name='Logo',
+            ),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_image',
+            field=models.FileField(
+                blank=True, help_text='Imagen de perfil', max_length=255, null=True,
+                storage=apps.authentication.storage.ContentAddressedStorage(),
+                upload_to='avatars/',
+            ),
+        ),
+        migrations.RunPython(move_images_to_storage, move_images_to_database),
+        migrations.RemoveField(model_name='company', name='logo_base64'),
+        migrations.RemoveField(model_name='user', name='profile_image_base64'),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:34
+
+import apps.authentication.images
+import apps.authentication.storage
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.db import migrations, transaction
+
+CHUNK_SIZE = 100
+
+
+def generate_variants(apps, schema_editor):
+    """
+    Re-procesa las imágenes ya guardadas para crear sus miniaturas, por bloques.
+    El original re-codificado se borra cuando ninguna fila lo usa: el storage
+    es content-addressed y varias filas pueden compartir el mismo archivo
+    """
+    for model_name, field_name in (('Company', 'logo'), ('User', 'profile_image')):
+        model = apps.get_model('authentication', model_name)
+        storage = model._meta.get_field(field_name).storage
+        ids = list(
+            model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            .order_by('id').values_list('id', flat=True)
+        )
+        processed = skipped = removed = 0
+        for start in range(0, len(ids), CHUNK_SIZE):
+            replaced = set()
+            with transaction.atomic():
+                for instance in model.objects.filter(id__in=ids[start:start + CHUNK_SIZE]).only('id', field_name):
+                    image = getattr(instance, field_name)
+                    original = image.name
+                    try:
+                        with image.open('rb') as handle:
+                            content = ContentFile(handle.read(), name=posixpath.basename(image.name))
+                        setattr(instance, field_name, content)
+                        # ImageVariantsField.pre_save genera las versiones
+                        instance.save(update_fields=[field_name])
+                    except (OSError, ValueError):
+                        skipped += 1
+                        continue
+                    processed += 1
+                    if getattr(instance, field_name).name != original:
+                        replaced.add(original)
+
+            # Con el bloque ya confirmado: los que siguen referenciados se borran
+            # al procesar la última fila que los usa
+            for name in replaced:
+                if not model.objects.filter(**{field_name: name}).exists():
+                    storage.delete(name)
+                    removed += 1
+        print(
+            f"🖼️ {model_name}.{field_name}: {processed} imágenes procesadas, {skipped} omitidas, "
+            f"{removed} originales eliminados"
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0005_images_to_file_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='company',
+            name='logo',
+            field=apps.authentication.images.ImageVariantsField(blank=True, image_format='PNG', max_length=255, null=True, storage=apps.authentication.storage.ContentAddressedStorage(), upload_to='logos/', verbose_name='Logo'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_image',
+            field=apps.authentication.images.ImageVariantsField(blank=True, help_text='Imagen de perfil', max_length=255, null=True, storage=apps.authentication.storage.ContentAddressedStorage(), upload_to='avatars/'),
+        ),
+        migrations.RunPython(generate_variants, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,51 @@
-import base64
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
-from django.core.files.base import ContentFile
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
-import os
+
+from .images import ImageVariantsField
+from .storage import image_storage
+
+
+def _per_company(queryset, aggregate):
+    """Subconsulta correlacionada con `aggregate` sobre las filas de `queryset` de cada empresa"""
+    return Subquery(
+        queryset.filter(company=OuterRef('pk'))
+        .order_by()
+        .values('company')
+        .annotate(value=aggregate)
+        .values('value')[:1]
+    )
+
+
+class CompanyQuerySet(models.QuerySet):
+
+    def with_directory_stats(self):
+        """
+        Anota conteos de usuarios (total, activos, clientes, staff), cantidad de
+        registros de calidad y fecha de la última sincronización. Son
+        subconsultas por empresa: nunca se cargan los usuarios ni los registros
+        """
+        from apps.quality_data.models import QualityData
+
+        def user_count(**filters):
+            return Coalesce(
+                _per_company(User.objects.filter(**filters), Count('id')), 0,
+                output_field=IntegerField(),
+            )
+
+        return self.annotate(
+            users_count=user_count(),
+            active_users=user_count(is_active=True),
+            client_users=user_count(is_client=True),
+            staff_users=user_count(is_staff=True),
+            quality_records_count=Coalesce(
+                _per_company(QualityData.objects.all(), Count('id')), 0,
+                output_field=IntegerField(),
+            ),
+            last_sync_at=_per_company(QualityData.objects.all(), Max('updated_at')),
+        )
 
 
 class Company(models.Model):
@@ -53,7 +95,10 @@ class Company(models.Model):
 
     name = models.CharField(max_length=200, verbose_name="Nombre de la Empresa")
     domain = models.CharField(max_length=100, unique=True, verbose_name="Dominio")
-    logo = models.TextField(blank=True, null=True, verbose_name="Logo (Base64)")
+    logo = ImageVariantsField(
+        upload_to='logos/', storage=image_storage, image_format='PNG', max_length=255,
+        blank=True, null=True, verbose_name="Logo"
+    )
     rubro = models.CharField(max_length=50, choices=RUBRO_CHOICES, verbose_name="Rubro")
     pais = models.CharField(max_length=2, choices=PAIS_CHOICES, verbose_name="País")
     direccion = models.TextField(blank=True, verbose_name="Dirección")
@@ -65,6 +110,8 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
 
+    objects = CompanyQuerySet.as_manager()
+
     class Meta:
         db_table = 'auth_company'
         verbose_name = 'Empresa'
@@ -92,7 +139,7 @@ class Company(models.Model):
     def logo_url(self):
         """Retorna la URL del logo para el frontend"""
         if self.logo:
-            return f"data:image/png;base64,{self.logo}"
+            return self.logo.url
         return None
 
     @property
@@ -151,6 +198,19 @@ class UserManager(BaseUserManager):
         
         return self.create_user(email, password, **extra_fields)
 
+    def for_session(self):
+        """
+        Usuario con empresa y rol en una sola consulta, limitada a las columnas
+        que usan el login, el perfil y los claims del token
+        """
+        return self.select_related('company', 'role').only(
+            'id', 'password', 'email', 'username', 'first_name', 'last_name',
+            'phone', 'cargo', 'departamento', 'profile_image',
+            'is_client', 'is_active', 'is_staff', 'is_superuser',
+            'company__id', 'company__name', 'company__domain', 'company__logo',
+            'role__id', 'role__name',
+        )
+
 
 class Role(models.Model):
     """
@@ -214,7 +274,10 @@ class User(AbstractUser):
     is_client = models.BooleanField(default=True)
     cargo = models.CharField(max_length=100, blank=True, verbose_name="Cargo")
     departamento = models.CharField(max_length=100, blank=True, verbose_name="Departamento")
-    profile_image = models.TextField(blank=True, null=True, help_text="Imagen de perfil en Base64")
+    profile_image = ImageVariantsField(
+        upload_to='avatars/', storage=image_storage, max_length=255,
+        blank=True, null=True, help_text="Imagen de perfil"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -244,7 +307,7 @@ class User(AbstractUser):
     def profile_image_url(self):
         """Retorna la URL de la imagen de perfil para el frontend"""
         if self.profile_image:
-            return f"data:image/png;base64,{self.profile_image}"
+            return self.profile_image.url
         return None
 
     @property
@@ -1,7 +1,64 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from .images import open_image
 from .models import User, Company, Role
+from .storage import decode_base64_image
+
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+
+
+def requested_image_size(request, sizes):
+    """?image_size=N -> la menor versión de al menos N px (la mayor si no se indica)"""
+    try:
+        requested = int(request.GET.get('image_size', ''))
+    except ValueError:
+        return sizes[-1]
+    return next((size for size in sizes if size >= requested), sizes[-1])
+
+
+def media_url(file, request=None):
+    """URL del archivo (absoluta si hay request), o None si no hay archivo"""
+    if not file:
+        return None
+    name = file.name
+    sizes = getattr(file.field, 'sizes', None)
+    if request is not None and sizes:
+        name = file.field.variant_name(name, requested_image_size(request, sizes))
+    url = file.storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def validate_image_file(value):
+    """Tamaño máximo y contenido decodificable por Pillow"""
+    if value.size > MAX_IMAGE_SIZE:
+        raise serializers.ValidationError("El archivo no puede ser mayor a 5MB.")
+    try:
+        open_image(value)
+    except ValueError:
+        raise serializers.ValidationError("El archivo no es una imagen válida.")
+    return value
+
+
+class Base64ImageField(serializers.FileField):
+    """
+    Acepta un archivo subido o una imagen en Base64 (formato anterior de la API)
+    y se representa como la URL del archivo guardado
+    """
+
+    def to_internal_value(self, data):
+        if data == '':
+            # Cadena vacía: quitar la imagen
+            return None
+        if isinstance(data, str):
+            try:
+                data = decode_base64_image(data, self.field_name)
+            except ValueError:
+                raise serializers.ValidationError("La imagen debe estar en formato Base64 válido (JPEG, PNG, GIF o WEBP).")
+        return validate_image_file(super().to_internal_value(data))
+
+    def to_representation(self, value):
+        return media_url(value, self.context.get('request'))
 
 
 class CompanySerializer(serializers.ModelSerializer):
@@ -9,7 +66,15 @@ class CompanySerializer(serializers.ModelSerializer):
     pais_display = serializers.CharField(read_only=True)
     rubro_display = serializers.CharField(read_only=True)
     users_count = serializers.IntegerField(read_only=True)
-    logo_url = serializers.CharField(read_only=True)
+    active_users = serializers.IntegerField(read_only=True)
+    client_users = serializers.IntegerField(read_only=True)
+    staff_users = serializers.IntegerField(read_only=True)
+    quality_records_count = serializers.IntegerField(read_only=True)
+    last_sync_at = serializers.DateTimeField(read_only=True)
+    # logo solo se escribe (archivo o Base64); la URL del archivo se lee en logo_url,
+    # igual que profile_image_file/profile_image_url en UserSerializer
+    logo = Base64ImageField(write_only=True, required=False, allow_null=True)
+    logo_url = serializers.SerializerMethodField()
     logo_file = serializers.FileField(write_only=True, required=False, help_text="Archivo de imagen para el logo")
 
     class Meta:
@@ -17,7 +82,8 @@ class CompanySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'domain', 'logo', 'logo_url', 'logo_file', 'rubro', 'rubro_display',
             'pais', 'pais_display', 'direccion', 'telefono', 'email_contacto',
-            'website', 'descripcion', 'activo', 'created_at', 'updated_at', 'users_count'
+            'website', 'descripcion', 'activo', 'created_at', 'updated_at', 'users_count',
+            'active_users', 'client_users', 'staff_users', 'quality_records_count', 'last_sync_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'users_count']
 
@@ -25,41 +91,33 @@ class CompanySerializer(serializers.ModelSerializer):
         """Validar archivo de imagen"""
         if value:
             # Verificar tipo de archivo
-            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif']
+            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
             if value.content_type not in allowed_types:
-                raise serializers.ValidationError("Solo se permiten archivos de imagen (JPEG, PNG, GIF).")
+                raise serializers.ValidationError("Solo se permiten archivos de imagen (JPEG, PNG, GIF, WEBP).")
             
-            # Verificar tamaño (máximo 5MB)
-            if value.size > 5 * 1024 * 1024:
-                raise serializers.ValidationError("El archivo no puede ser mayor a 5MB.")
+            # Verificar tamaño (máximo 5MB) y que Pillow pueda decodificarla
+            validate_image_file(value)
         
         return value
 
+    def get_logo_url(self, obj):
+        return media_url(obj.logo, self.context.get('request'))
+
     def create(self, validated_data):
-        """Crear empresa con conversión de imagen a Base64"""
+        """Crear empresa guardando el logo como archivo"""
         logo_file = validated_data.pop('logo_file', None)
         
         if logo_file:
-            # Convertir imagen a Base64
-            import base64
-            logo_file.seek(0)
-            logo_data = logo_file.read()
-            logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-            validated_data['logo'] = logo_base64
+            validated_data['logo'] = logo_file
         
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        """Actualizar empresa con conversión de imagen a Base64"""
+        """Actualizar empresa guardando el logo como archivo"""
         logo_file = validated_data.pop('logo_file', None)
         
         if logo_file:
-            # Convertir imagen a Base64
-            import base64
-            logo_file.seek(0)
-            logo_data = logo_file.read()
-            logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-            validated_data['logo'] = logo_base64
+            validated_data['logo'] = logo_file
         
         return super().update(instance, validated_data)
 
@@ -77,30 +135,24 @@ class CompanySerializer(serializers.ModelSerializer):
         
         return value
 
-    def validate_logo(self, value):
-        """Validación para el logo en Base64"""
-        if value:
-            try:
-                # Verificar que sea un string válido de Base64
-                import base64
-                base64.b64decode(value)
-            except Exception:
-                raise serializers.ValidationError("El logo debe estar en formato Base64 válido.")
-        
-        return value
-
 
 class CompanyListSerializer(serializers.ModelSerializer):
-    """Serializer simplificado para listar empresas"""
+    """Serializer simplificado para listar empresas (queryset con with_directory_stats)"""
     pais_display = serializers.CharField(read_only=True)
     rubro_display = serializers.CharField(read_only=True)
     users_count = serializers.IntegerField(read_only=True)
+    active_users = serializers.IntegerField(read_only=True)
+    client_users = serializers.IntegerField(read_only=True)
+    staff_users = serializers.IntegerField(read_only=True)
+    quality_records_count = serializers.IntegerField(read_only=True)
+    last_sync_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = Company
         fields = [
             'id', 'name', 'domain', 'rubro', 'rubro_display',
-            'pais', 'pais_display', 'activo', 'users_count'
+            'pais', 'pais_display', 'activo', 'users_count',
+            'active_users', 'client_users', 'staff_users', 'quality_records_count', 'last_sync_at'
         ]
 
 
@@ -125,7 +177,7 @@ class UserSerializer(serializers.ModelSerializer):
     role_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     role_name = serializers.CharField(read_only=True)
     full_name = serializers.CharField(read_only=True)
-    profile_image_url = serializers.CharField(read_only=True)
+    profile_image_url = serializers.SerializerMethodField()
     is_admin = serializers.BooleanField(read_only=True)
     can_edit_company = serializers.BooleanField(read_only=True)
     can_manage_users = serializers.BooleanField(read_only=True)
@@ -168,16 +220,18 @@ class UserSerializer(serializers.ModelSerializer):
         """Validar archivo de imagen de perfil"""
         if value:
             # Verificar tipo de archivo
-            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif']
+            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
             if value.content_type not in allowed_types:
-                raise serializers.ValidationError("Solo se permiten archivos de imagen (JPEG, PNG, GIF).")
+                raise serializers.ValidationError("Solo se permiten archivos de imagen (JPEG, PNG, GIF, WEBP).")
             
-            # Verificar tamaño (máximo 5MB)
-            if value.size > 5 * 1024 * 1024:
-                raise serializers.ValidationError("El archivo no puede ser mayor a 5MB.")
+            # Verificar tamaño (máximo 5MB) y que Pillow pueda decodificarla
+            validate_image_file(value)
         
         return value
 
+    def get_profile_image_url(self, obj):
+        return media_url(obj.profile_image, self.context.get('request'))
+
     def update(self, instance, validated_data):
         """Actualizar usuario con validación de empresa y rol"""
         company_id = validated_data.pop('company_id', None)
@@ -199,12 +253,7 @@ class UserSerializer(serializers.ModelSerializer):
                 pass
 
         if profile_image_file:
-            # Convertir imagen a Base64
-            import base64
-            profile_image_file.seek(0)
-            image_data = profile_image_file.read()
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-            validated_data['profile_image'] = image_base64
+            validated_data['profile_image'] = profile_image_file
 
         return super().update(instance, validated_data)
 
@@ -217,9 +266,6 @@ class UserSerializer(serializers.ModelSerializer):
         data['can_edit_company'] = instance.can_edit_company()
         data['can_manage_users'] = instance.can_manage_users()
         
-        # Agregar la URL de la imagen de perfil
-        data['profile_image_url'] = instance.profile_image_url
-        
         return data
 
 
@@ -236,6 +282,65 @@ class UserListSerializer(serializers.ModelSerializer):
         ]
 
 
+class CompanySummarySerializer(serializers.ModelSerializer):
+    """Empresa resumida para la sesión (login y perfil)"""
+    logo_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Company
+        fields = ['id', 'name', 'domain', 'logo_url']
+
+    def get_logo_url(self, obj):
+        return media_url(obj.logo, self.context.get('request'))
+
+
+class RoleSummarySerializer(serializers.ModelSerializer):
+    """Rol resumido para la sesión (login y perfil)"""
+
+    class Meta:
+        model = Role
+        fields = ['id', 'name', 'display_name']
+
+
+class SessionUserSerializer(serializers.ModelSerializer):
+    """
+    Representación liviana del usuario para login y perfil. Solo usa las
+    columnas de User.objects.for_session(); el detalle completo (empresa y
+    rol con todos sus campos) se pide con ?full=true
+    """
+    company = CompanySummarySerializer(read_only=True)
+    company_name = serializers.CharField(read_only=True)
+    role = RoleSummarySerializer(read_only=True)
+    role_name = serializers.CharField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    profile_image_url = serializers.SerializerMethodField()
+    is_admin = serializers.SerializerMethodField()
+    can_edit_company = serializers.SerializerMethodField()
+    can_manage_users = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'email', 'username', 'first_name', 'last_name', 'full_name',
+            'company', 'company_name', 'role', 'role_name',
+            'phone', 'cargo', 'departamento', 'is_client', 'is_active', 'is_staff', 'is_superuser',
+            'is_admin', 'can_edit_company', 'can_manage_users', 'profile_image_url',
+        ]
+        read_only_fields = fields
+
+    def get_profile_image_url(self, obj):
+        return media_url(obj.profile_image, self.context.get('request'))
+
+    def get_is_admin(self, obj):
+        return obj.is_admin()
+
+    def get_can_edit_company(self, obj):
+        return obj.can_edit_company()
+
+    def get_can_manage_users(self, obj):
+        return obj.can_manage_users()
+
+
 class LoginSerializer(serializers.Serializer):
     """Serializer para el login"""
     email = serializers.EmailField()
@@ -0,0 +1,78 @@
+"""
+Almacenamiento de imágenes (logos y fotos de perfil) direccionado por contenido
+"""
+import base64
+import binascii
+import hashlib
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+# Firmas de los formatos aceptados -> extensión
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+
+
+def image_extension(data):
+    """Extensión según los primeros bytes de la imagen, o None si no es un formato aceptado"""
+    for signature, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def decode_base64_image(value, name='imagen'):
+    """
+    'data:image/png;base64,iVBOR...' o 'iVBOR...' -> ContentFile con la extensión
+    del formato detectado. Lanza ValueError si no es Base64 o no es una imagen
+    """
+    if ';base64,' in value[:100]:
+        value = value.split(';base64,', 1)[1]
+    try:
+        data = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Base64 inválido')
+    extension = image_extension(data)
+    if extension is None:
+        raise ValueError('Formato de imagen no soportado')
+    return ContentFile(data, name=f'{name}{extension}')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Guarda cada archivo como <carpeta>/<ab>/<sha256><ext>. El mismo contenido
+    siempre tiene la misma URL, así que nginx puede servirlo como inmutable,
+    y las subidas repetidas no duplican archivos
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        folder = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(folder, digest[:2], f'{digest}{extension}')
+        return self.save_as(name, content, max_length=max_length)
+
+    def save_as(self, name, content, max_length=None):
+        """
+        Guarda con el nombre exacto, que ya debe derivar del contenido (p. ej.
+        las miniaturas de una imagen). Si existe, es el mismo archivo
+        """
+        if self.exists(name):
+            return name
+        content.seek(0)
+        return super().save(name, content, max_length=max_length)
+
+
+image_storage = ContentAddressedStorage()
@@ -0,0 +1,245 @@
+"""
+Presupuesto de consultas de los endpoints de autenticación
+"""
+import base64
+import importlib
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+
+from agro_backend.testing import PASSWORD, QueryBudgetTestCase, add_companies, add_users
+from apps.authentication.models import Company, Role, User
+from apps.quality_data.models import QualityData
+
+
+class AuthenticationQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_login(self):
+        self.client.credentials()
+        response = self.assertQueryBudget(
+            1, reverse('authentication:login'), method='post',
+            data={'email': 'admin@agrotest.com', 'password': PASSWORD},
+        )
+        self.assertEqual(response.data['user']['company']['name'], 'Agro Test')
+        self.assertTrue(response.data['user']['is_admin'])
+
+    def test_login_full(self):
+        self.client.credentials()
+        response = self.assertQueryBudget(
+            2, reverse('authentication:login') + '?full=true', method='post',
+            data={'email': 'admin@agrotest.com', 'password': PASSWORD},
+        )
+        self.assertIn('rubro', response.data['user']['company'])
+
+    def test_token_refresh_updates_claims(self):
+        login = self.client.post(
+            reverse('authentication:login'),
+            {'email': 'admin@agrotest.com', 'password': PASSWORD}, format='json',
+        )
+        admin = self.data['admin']
+        admin.role = self.data['roles']['manager']
+        admin.save()
+        response = self.client.post(
+            reverse('authentication:token_refresh'),
+            {'refresh': login.data['tokens']['refresh']}, format='json',
+        )
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['company_id'], self.data['company'].id)
+        self.assertEqual(access['company_name'], 'Agro Test')
+        self.assertEqual(access['role'], 'manager')
+
+    def test_token_refresh(self):
+        login = self.client.post(
+            reverse('authentication:login'),
+            {'email': 'admin@agrotest.com', 'password': PASSWORD}, format='json',
+        )
+        self.client.credentials()
+        self.assertQueryBudget(
+            1, reverse('authentication:token_refresh'), method='post',
+            data={'refresh': login.data['tokens']['refresh']},
+        )
+
+    def test_profile(self):
+        self.assertQueryBudget(0, reverse('authentication:profile'))
+
+    def test_profile_lean_and_full(self):
+        lean = self.client.get(reverse('authentication:profile')).data['user']
+        self.assertEqual(set(lean['company']), {'id', 'name', 'domain', 'logo_url'})
+        self.assertEqual(set(lean['role']), {'id', 'name', 'display_name'})
+        full = self.client.get(reverse('authentication:profile'), {'full': 'true'}).data['user']
+        self.assertIn('rubro', full['company'])
+        self.assertIn('permissions', full['role'])
+
+    def test_update_profile(self):
+        self.assertQueryBudget(
+            1, reverse('authentication:update_profile'), method='patch',
+            data={'cargo': 'Jefe de calidad'},
+        )
+
+    def test_user_list(self):
+        self.assertPaginatedBudget(2, reverse('authentication:user_list_create'))
+
+    def test_user_detail(self):
+        url = reverse('authentication:user_detail', args=[self.data['admin'].id])
+        self.assertQueryBudget(2, url)
+
+    def test_company_list(self):
+        self.assertPaginatedBudget(2, reverse('authentication:company_list_create'))
+
+    def test_company_detail(self):
+        url = reverse('authentication:company_detail', args=[self.data['company'].id])
+        self.assertConstantBudget(
+            1, url, lambda: add_users(self.data['company'], self.data['roles']['viewer'], 5)
+        )
+
+    def test_company_users(self):
+        url = reverse('authentication:company_users', args=[self.data['company'].id])
+        self.assertConstantBudget(
+            2, url, lambda: add_users(self.data['company'], self.data['roles']['viewer'], 5)
+        )
+
+    def test_company_stats(self):
+        url = reverse('authentication:company_stats', args=[self.data['company'].id])
+        self.assertConstantBudget(
+            1, url, lambda: add_users(self.data['company'], self.data['roles']['viewer'], 5)
+        )
+
+    def test_company_stats_values(self):
+        company = self.data['company']
+        User.objects.filter(email='usuario1@agrotest.com').update(is_active=False)
+        response = self.client.get(reverse('authentication:company_stats', args=[company.id]))
+        latest = QualityData.objects.filter(company=company).latest('updated_at').updated_at
+        self.assertEqual(response.data['total_users'], company.users.count())
+        self.assertEqual(response.data['active_users'], company.users.filter(is_active=True).count())
+        self.assertEqual(response.data['staff_users'], 1)
+        self.assertEqual(response.data['quality_records_count'], self.rows)
+        self.assertEqual(response.data['last_sync_at'], latest)
+
+        empty = self.client.get(reverse('authentication:company_detail', args=[self.data['other_company'].id]))
+        self.assertEqual(empty.data['quality_records_count'], 0)
+        self.assertIsNone(empty.data['last_sync_at'])
+
+    def test_role_list(self):
+        self.assertPaginatedBudget(
+            2, reverse('authentication:role_list_create'), page_sizes=(2, Role.objects.count())
+        )
+
+    def test_role_detail(self):
+        url = reverse('authentication:role_detail', args=[self.data['roles']['viewer'].id])
+        self.assertQueryBudget(1, url)
+
+    def test_profile_reflects_changes_to_cached_user(self):
+        admin = self.data['admin']
+        admin.first_name = 'Renombrado'
+        admin.save()
+        response = self.assertQueryBudget(1, reverse('authentication:profile'))
+        self.assertEqual(response.data['user']['first_name'], 'Renombrado')
+
+
+# PNG de 1x1
+PIXEL_PNG = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+
+
+class ImageStorageTests(QueryBudgetTestCase):
+    rows = 1
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def test_base64_logo_is_stored_as_file(self):
+        company = self.data['company']
+        url = reverse('authentication:company_detail', args=[company.id])
+        response = self.client.patch(url, {'logo': f'data:image/png;base64,{PIXEL_PNG}'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        company.refresh_from_db()
+        self.assertRegex(company.logo.name, r'^logos/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(response.data['logo_url'], f'http://testserver/media/{company.logo.name}')
+        # La URL va una sola vez: logo es solo de escritura
+        self.assertNotIn('logo', response.data)
+
+        # Mismo contenido, mismo archivo
+        other = self.data['other_company']
+        self.client.patch(
+            reverse('authentication:company_detail', args=[other.id]), {'logo': PIXEL_PNG}, format='json'
+        )
+        other.refresh_from_db()
+        self.assertEqual(other.logo.name, company.logo.name)
+
+    def test_invalid_logo_is_rejected(self):
+        url = reverse('authentication:company_detail', args=[self.data['company'].id])
+        response = self.client.patch(url, {'logo': 'no-es-una-imagen'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Company.objects.get(id=self.data['company'].id).logo)
+
+    def test_profile_returns_image_url(self):
+        admin = self.data['admin']
+        upload = SimpleUploadedFile('foto.PNG', base64.b64decode(PIXEL_PNG), content_type='image/png')
+        self.client.patch(
+            reverse('authentication:update_profile'), {'profile_image_file': upload}, format='multipart'
+        )
+        response = self.client.get(reverse('authentication:profile'))
+        admin.refresh_from_db()
+        self.assertRegex(admin.profile_image.name, r'^avatars/[0-9a-f]{2}/[0-9a-f]{64}\.webp$')
+        self.assertEqual(
+            response.data['user']['profile_image_url'], f'http://testserver/media/{admin.profile_image.name}'
+        )
+
+    def test_upload_generates_stripped_variants(self):
+        source = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Camara'
+        Image.new('RGB', (2000, 1000), 'green').save(source, format='JPEG', exif=exif)
+        upload = SimpleUploadedFile('foto.jpg', source.getvalue(), content_type='image/jpeg')
+        self.client.patch(
+            reverse('authentication:update_profile'), {'profile_image_file': upload}, format='multipart'
+        )
+
+        admin = self.data['admin']
+        admin.refresh_from_db()
+        field = admin._meta.get_field('profile_image')
+        for size in field.sizes:
+            with field.storage.open(field.variant_name(admin.profile_image.name, size)) as handle:
+                with Image.open(handle) as variant:
+                    self.assertEqual(variant.format, 'WEBP')
+                    self.assertEqual(max(variant.size), size)
+                    self.assertNotIn('exif', variant.info)
+
+        response = self.client.get(reverse('authentication:profile'), {'image_size': 100})
+        self.assertTrue(response.data['user']['profile_image_url'].endswith('-128.webp'))
+
+    def test_variant_migration_removes_replaced_originals(self):
+        migration = importlib.import_module('apps.authentication.migrations.0006_image_variants')
+        source = io.BytesIO()
+        Image.new('RGB', (40, 20), 'red').save(source, format='JPEG', quality=100)
+        storage = Company._meta.get_field('logo').storage
+        # Archivo de 0005: sin re-codificar ni miniaturas, compartido por dos empresas
+        original = storage.save('logos/logo.jpg', ContentFile(source.getvalue()))
+        kept = storage.save('logos/ajeno.jpg', ContentFile(b'no es del migrado'))
+        companies = [self.data['company'], self.data['other_company']]
+        Company.objects.filter(id__in=[company.id for company in companies]).update(logo=original)
+
+        # Un registro por bloque: el archivo compartido sigue en uso tras el primero
+        with mock.patch.object(migration, 'CHUNK_SIZE', 1):
+            migration.generate_variants(apps, None)
+
+        names = set(Company.objects.filter(id__in=[company.id for company in companies]).values_list('logo', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertNotIn(original, names)
+        self.assertTrue(storage.exists(names.pop()))
+        self.assertFalse(storage.exists(original))
+        self.assertTrue(storage.exists(kept))
@@ -0,0 +1,73 @@
+"""
+Tokens JWT que llevan la empresa y el rol del usuario como claims
+"""
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+COMPANY_ID_CLAIM = 'company_id'
+COMPANY_NAME_CLAIM = 'company_name'
+ROLE_CLAIM = 'role'
+
+
+def set_user_claims(token, user):
+    """Copia empresa y rol del usuario al token (se heredan en el access token)"""
+    token[COMPANY_ID_CLAIM] = user.company_id
+    token[COMPANY_NAME_CLAIM] = user.company.name if user.company_id else None
+    token[ROLE_CLAIM] = user.role.name if user.role_id else None
+
+
+class CompanyRefreshToken(RefreshToken):
+    """RefreshToken cuyo access token permite autenticar sin consultar la BD"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+
+class CompanyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Igual que TokenRefreshSerializer, pero vuelve a leer empresa y rol del
+    usuario (con la misma consulta que ya hacía) para que los claims no
+    queden desactualizados más allá de la vida de un access token
+    """
+    token_class = CompanyRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        user = (
+            User.objects.select_related('company', 'role')
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        ) if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        set_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # App de blacklist no instalada
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
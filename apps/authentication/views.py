@@ -1,14 +1,14 @@
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from django.db.models import Q
+from django.db.models import F, Q
 from .models import User, Company, Role
 from .serializers import (
     UserSerializer, UserListSerializer, LoginSerializer, RegisterSerializer,
-    CompanySerializer, CompanyListSerializer, RoleSerializer
+    CompanySerializer, CompanyListSerializer, RoleSerializer, SessionUserSerializer
 )
+from .tokens import CompanyRefreshToken
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -57,7 +57,7 @@ class CompanyListCreateView(generics.ListCreateAPIView):
         if activo is not None:
             queryset = queryset.filter(activo=activo.lower() == 'true')
         
-        return queryset.select_related().prefetch_related('users')
+        return queryset.with_directory_stats()
 
     def perform_create(self, serializer):
         """Crear empresa con validaciones adicionales"""
@@ -78,7 +78,7 @@ class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        return Company.objects.select_related().prefetch_related('users')
+        return Company.objects.with_directory_stats()
 
     def perform_update(self, serializer):
         """Actualizar empresa con validaciones"""
@@ -86,8 +86,8 @@ class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy(self, instance):
         """Eliminar empresa con validaciones"""
-        # Verificar si hay usuarios asociados
-        if instance.users.exists():
+        # Verificar si hay usuarios asociados (conteo ya anotado)
+        if instance.users_count:
             raise permissions.PermissionDenied(
                 "No se puede eliminar una empresa que tiene usuarios asociados."
             )
@@ -157,6 +157,16 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
+def _session_user_data(request, user):
+    """Usuario liviano (SessionUserSerializer); con ?full=true, el UserSerializer completo"""
+    if request.query_params.get('full', '').lower() != 'true':
+        return SessionUserSerializer(user, context={'request': request}).data
+    if user.get_deferred_fields():
+        # Usuario cargado con for_session(): una consulta en vez de una por campo diferido
+        user = User.objects.select_related('company', 'role').get(pk=user.pk)
+    return UserSerializer(user, context={'request': request}).data
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def login_view(request):
@@ -167,13 +177,10 @@ def login_view(request):
         user = serializer.validated_data['user']
         
         # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
-        
-        # Serializar datos del usuario
-        user_serializer = UserSerializer(user)
+        refresh = CompanyRefreshToken.for_user(user)
         
         return Response({
-            'user': user_serializer.data,
+            'user': _session_user_data(request, user),
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -187,8 +194,7 @@ def login_view(request):
 @permission_classes([permissions.IsAuthenticated])
 def user_profile(request):
     """Vista para obtener el perfil del usuario autenticado"""
-    serializer = UserSerializer(request.user)
-    return Response({'user': serializer.data}, status=status.HTTP_200_OK)
+    return Response({'user': _session_user_data(request, request.user)}, status=status.HTTP_200_OK)
 
 
 @api_view(['PUT', 'PATCH'])
@@ -203,7 +209,7 @@ def update_profile(request):
     if request.FILES:
         data.update(request.FILES.dict())
     
-    serializer = UserSerializer(request.user, data=data, partial=True)
+    serializer = UserSerializer(request.user, data=data, partial=True, context={'request': request})
     
     if serializer.is_valid():
         print(f"Datos válidos: {serializer.validated_data}")
@@ -266,20 +272,12 @@ class RoleDetailView(generics.RetrieveUpdateDestroyAPIView):
 def company_stats(request, company_id):
     """Vista para obtener estadísticas de una empresa"""
     try:
-        company = Company.objects.get(id=company_id)
-        
-        # Estadísticas básicas
-        stats = {
-            'id': company.id,
-            'name': company.name,
-            'domain': company.domain,
-            'total_users': company.get_users_count(),
-            'active_users': company.users.filter(is_active=True).count(),
-            'client_users': company.users.filter(is_client=True).count(),
-            'staff_users': company.users.filter(is_staff=True).count(),
-            'created_at': company.created_at,
-            'updated_at': company.updated_at,
-        }
+        # Estadísticas básicas en una sola consulta
+        stats = Company.objects.with_directory_stats().values(
+            'id', 'name', 'domain', 'active_users', 'client_users', 'staff_users',
+            'quality_records_count', 'last_sync_at', 'created_at', 'updated_at',
+            total_users=F('users_count'),
+        ).get(id=company_id)
         
         return Response(stats, status=status.HTTP_200_OK)
     except Company.DoesNotExist:
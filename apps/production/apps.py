@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProductionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.production'
+
+    def ready(self):
+        # Registra las señales que invalidan las estadísticas del dashboard
+        from . import dashboard  # noqa: F401
@@ -0,0 +1,86 @@
+"""
+Estadísticas del dashboard de producción, cacheadas con su ETag.
+
+La caché se invalida al guardar o eliminar un Shipment, Inspection o
+Product en el mismo proceso; en los demás workers (y ante escrituras
+masivas que no emiten señales) expira tras DASHBOARD_STATS_CACHE_TTL.
+
+Se calculan siempre contra 'default': con réplica (agro_backend.db_router)
+un cálculo tras una escritura cachearía los números atrasados de la réplica.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import quote_etag
+
+from .models import Inspection, Product, Shipment
+from .serializers import ShipmentListSerializer
+
+CACHE_KEY = 'production:dashboard_stats'
+
+
+def compute_dashboard_stats():
+    """
+    Todos los conteos en una consulta: Product -> Shipment -> Inspection con
+    LEFT JOIN (cada inspección tiene embarque y cada embarque producto) y
+    agregación condicional por estado
+    """
+    statuses = [status for status, _ in Inspection.STATUS_CHOICES]
+    counts = Product.objects.using(DEFAULT_DB_ALIAS).order_by().aggregate(
+        total_products=Count('id', distinct=True),
+        total_shipments=Count('shipment', distinct=True),
+        total_inspections=Count('shipment__inspections'),
+        **{
+            status: Count('shipment__inspections', filter=Q(shipment__inspections__status=status))
+            for status in statuses
+        },
+    )
+
+    recent_shipments = (
+        Shipment.objects.using(DEFAULT_DB_ALIAS).select_related('product').with_inspection_stats()[:5]
+    )
+    return {
+        'total_shipments': counts['total_shipments'],
+        'total_products': counts['total_products'],
+        'total_inspections': counts['total_inspections'],
+        'pending_inspections': counts['pending'],
+        'completed_inspections': counts['completed'],
+        'recent_shipments': list(ShipmentListSerializer(recent_shipments, many=True).data),
+        'inspection_status_breakdown': [
+            {'status': status, 'count': counts[status]}
+            for status in sorted(statuses) if counts[status]
+        ],
+    }
+
+
+def get_dashboard_stats():
+    """Retorna (stats, etag), calculándolos solo si no están en caché"""
+    cached = cache.get(CACHE_KEY)
+    if cached is None:
+        stats = compute_dashboard_stats()
+        payload = json.dumps(stats, cls=DjangoJSONEncoder, sort_keys=True)
+        etag = quote_etag(hashlib.md5(payload.encode('utf-8')).hexdigest())
+        cached = (stats, etag)
+        cache.set(CACHE_KEY, cached, getattr(settings, 'DASHBOARD_STATS_CACHE_TTL', 30))
+    return cached
+
+
+def invalidate_dashboard_stats():
+    cache.delete(CACHE_KEY)
+
+
+@receiver(post_save, sender=Shipment)
+@receiver(post_delete, sender=Shipment)
+@receiver(post_save, sender=Inspection)
+@receiver(post_delete, sender=Inspection)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def _invalidate_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
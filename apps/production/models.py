@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count, Max, Q
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -23,6 +24,25 @@ class Product(models.Model):
         return self.name
 
 
+class ShipmentQuerySet(models.QuerySet):
+
+    def with_inspection_stats(self):
+        """
+        Anota el total de inspecciones, el conteo por estado
+        (<estado>_inspections) y la fecha de la última inspección, con un
+        solo JOIN agrupado en vez de cargar las inspecciones
+        """
+        by_status = {
+            f'{status}_inspections': Count('inspections', filter=Q(inspections__status=status))
+            for status, _ in Inspection.STATUS_CHOICES
+        }
+        return self.annotate(
+            inspections_count=Count('inspections'),
+            last_inspection_date=Max('inspections__inspection_date'),
+            **by_status,
+        )
+
+
 class Shipment(models.Model):
     """
     Modelo para embarques/envíos
@@ -44,6 +64,8 @@ class Shipment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShipmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Embarque"
         verbose_name_plural = "Embarques"
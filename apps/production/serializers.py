@@ -1,7 +1,59 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Product, Shipment, Inspection, QualityReport, Sample
 
 
+def parse_expand(value):
+    """'inspections.samples,x' -> {'inspections', 'inspections.samples', 'x'} (incluye los prefijos)"""
+    expand = set()
+    for path in (value or '').split(','):
+        parts = [part.strip() for part in path.split('.') if part.strip()]
+        for depth in range(1, len(parts) + 1):
+            expand.add('.'.join(parts[:depth]))
+    return expand
+
+
+def _children(expand, name):
+    """Rutas de `expand` por debajo de `name`, relativas a él"""
+    prefix = f'{name}.'
+    return {path[len(prefix):] for path in expand if path.startswith(prefix)}
+
+
+def apply_expansion(queryset, serializer_class, expand, prefix=''):
+    """
+    Plan de carga para los anidados pedidos: select_related para relaciones
+    a uno y Prefetch (con su propio plan) para relaciones a muchos
+    """
+    for name, (child_class, options) in getattr(serializer_class, 'expandable_fields', {}).items():
+        if name not in expand:
+            continue
+        children = _children(expand, name)
+        if options.get('many'):
+            child_queryset = apply_expansion(child_class.Meta.model.objects.all(), child_class, children)
+            queryset = queryset.prefetch_related(Prefetch(f'{prefix}{name}', queryset=child_queryset))
+        else:
+            queryset = queryset.select_related(f'{prefix}{name}')
+            queryset = apply_expansion(queryset, child_class, children, prefix=f'{prefix}{name}__')
+    return queryset
+
+
+class ExpandableSerializerMixin:
+    """
+    Anidados opcionales: `expandable_fields` = {relación: (serializer, kwargs)}
+    y solo se incluyen los pedidos en `expand` (ver parse_expand)
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, (child_class, options) in self.expandable_fields.items():
+            if name not in expand:
+                continue
+            if issubclass(child_class, ExpandableSerializerMixin):
+                options = {**options, 'expand': _children(expand, name)}
+            self.fields[name] = child_class(read_only=True, **options)
+
+
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
@@ -20,9 +72,11 @@ class QualityReportSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class InspectionSerializer(serializers.ModelSerializer):
-    quality_report = QualityReportSerializer(read_only=True)
-    samples = SampleSerializer(many=True, read_only=True)
+class InspectionSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'quality_report': (QualityReportSerializer, {}),
+        'samples': (SampleSerializer, {'many': True}),
+    }
     inspection_type_display = serializers.CharField(source='get_inspection_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
 
@@ -31,9 +85,11 @@ class InspectionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ShipmentSerializer(serializers.ModelSerializer):
+class ShipmentSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'inspections': (InspectionSerializer, {'many': True}),
+    }
     product_name = serializers.CharField(source='product.name', read_only=True)
-    inspections = InspectionSerializer(many=True, read_only=True)
     transport_type_display = serializers.CharField(source='get_transport_type_display', read_only=True)
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
 
@@ -48,12 +104,19 @@ class ShipmentSerializer(serializers.ModelSerializer):
 
 
 class ShipmentListSerializer(serializers.ModelSerializer):
-    """Serializer simplificado para listado de embarques"""
+    """Serializer simplificado para listado de embarques (queryset con with_inspection_stats)"""
     product_name = serializers.CharField(source='product.name', read_only=True)
     transport_type_display = serializers.CharField(source='get_transport_type_display', read_only=True)
-    inspections_count = serializers.IntegerField(source='inspections.count', read_only=True)
+    inspections_count = serializers.IntegerField(read_only=True)
+    pending_inspections = serializers.IntegerField(read_only=True)
+    in_progress_inspections = serializers.IntegerField(read_only=True)
+    completed_inspections = serializers.IntegerField(read_only=True)
+    rejected_inspections = serializers.IntegerField(read_only=True)
+    last_inspection_date = serializers.DateTimeField(read_only=True)
     
     class Meta:
         model = Shipment
         fields = ['id', 'reference', 'product_name', 'shipper', 'consignee', 
-                 'transport_type_display', 'location', 'date', 'inspections_count']
+                 'transport_type_display', 'location', 'date', 'inspections_count',
+                 'pending_inspections', 'in_progress_inspections', 'completed_inspections',
+                 'rejected_inspections', 'last_inspection_date']
@@ -0,0 +1,184 @@
+"""
+Presupuesto de consultas de los endpoints de producción
+"""
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from agro_backend.testing import QueryBudgetTestCase, add_inspections, add_shipments
+from apps.production.models import Inspection, QualityReport, Sample, Shipment
+
+
+FULL_SHIPMENT_EXPAND = 'inspections.samples,inspections.quality_report'
+
+
+class ProductionQueryBudgetTests(QueryBudgetTestCase):
+
+    def grow_shipments(self):
+        add_shipments(self.data['product'], self.data['admin'], 5)
+
+    def test_dashboard_stats(self):
+        # Sin caché: conteos en una consulta + embarques recientes
+        self.assertConstantBudget(2, reverse('dashboard_stats'), self.grow_shipments)
+
+    def test_dashboard_stats_cached(self):
+        url = reverse('dashboard_stats')
+        first = self.assertQueryBudget(2, url)
+        self.assertEqual(first.data['total_inspections'], Inspection.objects.count())
+        self.assertEqual(
+            first.data['pending_inspections'], Inspection.objects.filter(status='pending').count()
+        )
+        self.assertQueryBudget(0, url)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Escribir un embarque invalida la caché y cambia el ETag
+        self.grow_shipments()
+        second = self.assertQueryBudget(2, url)
+        self.assertEqual(second.data['total_shipments'], Shipment.objects.count())
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_product_list(self):
+        self.assertPaginatedBudget(2, reverse('product_list_create'))
+
+    def test_product_detail(self):
+        self.assertQueryBudget(1, reverse('product_detail', args=[self.data['product'].id]))
+
+    def test_shipment_list(self):
+        self.assertPaginatedBudget(2, reverse('shipment_list_create'))
+        self.assertConstantBudget(
+            2, reverse('shipment_list_create'), lambda: add_inspections(Shipment.objects.first(), 10)
+        )
+
+    def test_shipment_list_inspection_stats(self):
+        shipment = Shipment.objects.first()
+        response = self.client.get(reverse('shipment_list_create'))
+        row = next(item for item in response.data['results'] if item['id'] == shipment.id)
+        inspections = shipment.inspections.all()
+        self.assertEqual(row['inspections_count'], inspections.count())
+        for status, _ in Inspection.STATUS_CHOICES:
+            self.assertEqual(row[f'{status}_inspections'], inspections.filter(status=status).count())
+        self.assertEqual(
+            parse_datetime(row['last_inspection_date']),
+            inspections.latest('inspection_date').inspection_date,
+        )
+
+    def test_shipment_detail(self):
+        shipment = Shipment.objects.first()
+        self.assertConstantBudget(
+            1, reverse('shipment_detail', args=[shipment.id]),
+            lambda: add_inspections(shipment, 4),
+        )
+
+    def test_shipment_detail_expanded(self):
+        shipment = Shipment.objects.first()
+        url = reverse('shipment_detail', args=[shipment.id]) + f'?expand={FULL_SHIPMENT_EXPAND}'
+        self.assertConstantBudget(3, url, lambda: add_inspections(shipment, 4))
+        inspection = self.client.get(url).data['inspections'][0]
+        self.assertIn('quality_report', inspection)
+        self.assertIn('samples', inspection)
+
+    def test_shipment_detail_expand_selects_nested_fields(self):
+        shipment = Shipment.objects.first()
+        url = reverse('shipment_detail', args=[shipment.id])
+        self.assertNotIn('inspections', self.client.get(url).data)
+        inspection = self.assertQueryBudget(2, url + '?expand=inspections').data['inspections'][0]
+        self.assertNotIn('samples', inspection)
+        self.assertNotIn('quality_report', inspection)
+        inspection = self.assertQueryBudget(3, url + '?expand=inspections.samples').data['inspections'][0]
+        self.assertIn('samples', inspection)
+        self.assertNotIn('quality_report', inspection)
+
+    def test_inspection_list(self):
+        self.assertPaginatedBudget(2, reverse('inspection_list_create'))
+
+    def test_inspection_list_expanded(self):
+        self.assertPaginatedBudget(3, reverse('inspection_list_create') + '?expand=samples,quality_report')
+
+    def test_inspection_detail(self):
+        url = reverse('inspection_detail', args=[Inspection.objects.first().id])
+        self.assertQueryBudget(1, url)
+        self.assertQueryBudget(2, url + '?expand=samples,quality_report')
+
+    def test_quality_report_list(self):
+        self.assertPaginatedBudget(2, reverse('quality_report_list_create'))
+
+    def test_quality_report_detail(self):
+        url = reverse('quality_report_detail', args=[QualityReport.objects.first().id])
+        self.assertQueryBudget(1, url)
+
+    def test_sample_list(self):
+        self.assertPaginatedBudget(2, reverse('sample_list_create'))
+
+    def test_sample_detail(self):
+        self.assertQueryBudget(1, reverse('sample_detail', args=[Sample.objects.first().id]))
+
+
+class ProductionBatchCreateTests(QueryBudgetTestCase):
+
+    def sample_items(self, count, inspection=None):
+        inspection = inspection or Inspection.objects.first()
+        return [
+            {'inspection': inspection.id, 'sample_id': f'B-{index}', 'quantity': '2.00', 'location_taken': 'Cámara'}
+            for index in range(count)
+        ]
+
+    def test_sample_batch_budget_independent_of_size(self):
+        url = reverse('sample_batch_create')
+        for count in (5, 50):
+            with self.subTest(count=count):
+                response = self.assertQueryBudget(4, url, method='post', data=self.sample_items(count), status=201)
+                self.assertEqual(response.data['created'], count)
+                ids = [result['id'] for result in response.data['results']]
+                self.assertEqual(Sample.objects.filter(id__in=ids, sample_id__startswith='B-').count(), count)
+
+    def test_sample_batch_partial_errors(self):
+        items = self.sample_items(3)
+        items[1]['inspection'] = 999999
+        items[2].pop('quantity')
+        response = self.client.post(reverse('sample_batch_create'), items, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created'], 1)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error'])
+        self.assertIn('inspection', response.data['results'][1]['errors'])
+        self.assertIn('quantity', response.data['results'][2]['errors'])
+
+    def test_batch_rejects_non_list_and_oversized(self):
+        url = reverse('sample_batch_create')
+        self.assertEqual(self.client.post(url, {'sample_id': 'X'}, format='json').status_code, 400)
+        with self.settings(BULK_CREATE_MAX_ITEMS=2):
+            self.assertEqual(self.client.post(url, self.sample_items(3), format='json').status_code, 400)
+        self.assertFalse(Sample.objects.filter(sample_id__startswith='B-').exists())
+
+    def test_inspection_batch_invalidates_dashboard(self):
+        shipment = Shipment.objects.first()
+        stats = self.client.get(reverse('dashboard_stats')).data
+        items = [
+            {'shipment': shipment.id, 'inspection_type': 'quality', 'inspection_point': 'Planta',
+             'inspector': 'Inspector', 'inspection_date': '2024-01-01T10:00:00Z'}
+            for _ in range(3)
+        ]
+        self.assertQueryBudget(4, reverse('inspection_batch_create'), method='post', data=items, status=201)
+        updated = self.client.get(reverse('dashboard_stats')).data
+        self.assertEqual(updated['total_inspections'], stats['total_inspections'] + 3)
+
+    def test_quality_report_batch_checks_uniqueness_in_bulk(self):
+        shipment = Shipment.objects.first()
+        taken = Inspection.objects.filter(quality_report__isnull=False).first()
+        free = Inspection.objects.create(
+            shipment=shipment, inspection_type='quality', inspection_point='Planta',
+            inspector='Inspector', inspection_date=taken.inspection_date,
+        )
+        items = [
+            {'inspection': free.id, 'overall_quality': 'good'},
+            {'inspection': free.id, 'overall_quality': 'fair'},
+            {'inspection': taken.id, 'overall_quality': 'good'},
+        ]
+        # in_bulk de inspecciones + unicidad + savepoint/insert/release
+        response = self.assertQueryBudget(
+            5, reverse('quality_report_batch_create'), method='post', data=items, status=207
+        )
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'error', 'error'])
+        self.assertIn('inspection', response.data['results'][2]['errors'])
+        self.assertEqual(QualityReport.objects.get(inspection=free).overall_quality, 'good')
@@ -16,12 +16,15 @@ urlpatterns = [
     # Inspections
     path('inspections/', views.InspectionListCreateView.as_view(), name='inspection_list_create'),
     path('inspections/<int:pk>/', views.InspectionDetailView.as_view(), name='inspection_detail'),
+    path('inspections/batch/', views.InspectionBatchCreateView.as_view(), name='inspection_batch_create'),
     
     # Quality Reports
     path('quality-reports/', views.QualityReportListCreateView.as_view(), name='quality_report_list_create'),
     path('quality-reports/<int:pk>/', views.QualityReportDetailView.as_view(), name='quality_report_detail'),
+    path('quality-reports/batch/', views.QualityReportBatchCreateView.as_view(), name='quality_report_batch_create'),
     
     # Samples
     path('samples/', views.SampleListCreateView.as_view(), name='sample_list_create'),
     path('samples/<int:pk>/', views.SampleDetailView.as_view(), name='sample_detail'),
+    path('samples/batch/', views.SampleBatchCreateView.as_view(), name='sample_batch_create'),
 ]
@@ -1,14 +1,34 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import Count
+from django.utils.cache import get_conditional_response, patch_cache_control
+from agro_backend.bulk import BulkCreateMixin
+from .dashboard import get_dashboard_stats, invalidate_dashboard_stats
 from .models import Product, Shipment, Inspection, QualityReport, Sample
 from .serializers import (
     ProductSerializer, ShipmentSerializer, ShipmentListSerializer,
-    InspectionSerializer, QualityReportSerializer, SampleSerializer
+    InspectionSerializer, QualityReportSerializer, SampleSerializer,
+    apply_expansion, parse_expand
 )
 
 
+class ExpandMixin:
+    """
+    ?expand=inspections,inspections.samples: serializa solo los anidados
+    pedidos y carga solo esas relaciones (ver apply_expansion)
+    """
+
+    def get_expand(self):
+        return parse_expand(self.request.query_params.get('expand'))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('expand', self.get_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        return apply_expansion(super().get_queryset(), self.get_serializer_class(), self.get_expand())
+
+
 # Product Views
 class ProductListCreateView(generics.ListCreateAPIView):
     queryset = Product.objects.all()
@@ -22,7 +42,7 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # Shipment Views
 class ShipmentListCreateView(generics.ListCreateAPIView):
-    queryset = Shipment.objects.select_related('product', 'created_by').prefetch_related('inspections')
+    queryset = Shipment.objects.select_related('product', 'created_by').with_inspection_stats()
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -30,14 +50,14 @@ class ShipmentListCreateView(generics.ListCreateAPIView):
         return ShipmentSerializer
 
 
-class ShipmentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Shipment.objects.select_related('product', 'created_by').prefetch_related('inspections__quality_report', 'inspections__samples')
+class ShipmentDetailView(ExpandMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Shipment.objects.select_related('product', 'created_by')
     serializer_class = ShipmentSerializer
 
 
 # Inspection Views
-class InspectionListCreateView(generics.ListCreateAPIView):
-    queryset = Inspection.objects.select_related('shipment__product').prefetch_related('quality_report', 'samples')
+class InspectionListCreateView(ExpandMixin, generics.ListCreateAPIView):
+    queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
 
     def get_queryset(self):
@@ -48,11 +68,21 @@ class InspectionListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class InspectionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Inspection.objects.select_related('shipment__product').prefetch_related('quality_report', 'samples')
+class InspectionDetailView(ExpandMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
 
 
+class InspectionBatchCreateView(BulkCreateMixin, generics.GenericAPIView):
+    """POST con una lista de inspecciones, insertadas en una sola transacción"""
+    queryset = Inspection.objects.all()
+    serializer_class = InspectionSerializer
+
+    def after_bulk_create(self, instances):
+        # bulk_create no emite post_save: invalidar el dashboard aquí
+        invalidate_dashboard_stats()
+
+
 # Quality Report Views
 class QualityReportListCreateView(generics.ListCreateAPIView):
     queryset = QualityReport.objects.select_related('inspection__shipment')
@@ -64,6 +94,12 @@ class QualityReportDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = QualityReportSerializer
 
 
+class QualityReportBatchCreateView(BulkCreateMixin, generics.GenericAPIView):
+    """POST con una lista de reportes; una inspección solo admite un reporte"""
+    queryset = QualityReport.objects.all()
+    serializer_class = QualityReportSerializer
+
+
 # Sample Views
 class SampleListCreateView(generics.ListCreateAPIView):
     queryset = Sample.objects.select_related('inspection__shipment')
@@ -82,27 +118,24 @@ class SampleDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = SampleSerializer
 
 
+class SampleBatchCreateView(BulkCreateMixin, generics.GenericAPIView):
+    """POST con una lista de muestras, insertadas en una sola transacción"""
+    queryset = Sample.objects.all()
+    serializer_class = SampleSerializer
+
+
 # Dashboard Statistics
 @api_view(['GET'])
 def dashboard_stats(request):
     """
-    Estadísticas para el dashboard
+    Estadísticas para el dashboard (cacheadas; responde 304 si el ETag coincide)
     """
-    stats = {
-        'total_shipments': Shipment.objects.count(),
-        'total_products': Product.objects.count(),
-        'total_inspections': Inspection.objects.count(),
-        'pending_inspections': Inspection.objects.filter(status='pending').count(),
-        'completed_inspections': Inspection.objects.filter(status='completed').count(),
-        'recent_shipments': ShipmentListSerializer(
-            Shipment.objects.select_related('product')[:5], 
-            many=True
-        ).data,
-        'inspection_status_breakdown': list(
-            Inspection.objects.values('status')
-            .annotate(count=Count('status'))
-            .order_by('status')
-        ),
-    }
-    
-    return Response(stats)
+    stats, etag = get_dashboard_stats()
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = Response(stats)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
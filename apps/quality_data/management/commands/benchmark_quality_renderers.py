@@ -0,0 +1,112 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from agro_backend.fixtures import create_benchmark_rows
+from agro_backend.parsers import ORJSONParser
+from agro_backend.renderers import ORJSONRenderer
+from apps.quality_data.models import QualityData
+from apps.quality_data.serializers import QualityDataListReader
+from apps.quality_data.services import QualityDataService
+
+
+class Command(BaseCommand):
+    help = 'Compara JSONRenderer contra ORJSONRenderer con payloads de lista y exportación'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Número de registros del payload de exportación'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=100,
+            help='Tamaño de página del payload de lista'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Repeticiones por variante (se reporta la mejor)'
+        )
+        parser.add_argument(
+            '--empresa',
+            type=str,
+            default='BENCHMARK',
+            help='Empresa usada para los registros temporales'
+        )
+
+    def handle(self, *args, **options):
+        empresa = options['empresa']
+
+        with transaction.atomic():
+            create_benchmark_rows(empresa, options['rows'])
+            queryset = QualityData.objects.filter(empresa=empresa).order_by('-fecha_registro')
+            reader = QualityDataListReader()
+            data = reader.serialize(reader.project(queryset))
+            payloads = {
+                'lista': {
+                    'count': len(data),
+                    'next': None,
+                    'previous': None,
+                    'results': data[:options['page_size']],
+                },
+                'exportación': {
+                    'data': data,
+                    'total_records': len(data),
+                    'export_date': timezone.now().isoformat(),
+                },
+                # Promedios crudos (Decimal) y datetime sin pasar por un serializer
+                'estadísticas': {
+                    **QualityDataService.get_quality_stats(empresa=empresa),
+                    'generado_utc': timezone.now(),
+                    'generado_local': timezone.localtime(),
+                },
+            }
+            transaction.set_rollback(True)
+
+        for name, payload in payloads.items():
+            self._compare(name, payload, options['repeat'])
+
+    def _compare(self, name, payload, repeat):
+        stdlib_time, stdlib_output = self._measure(repeat, lambda: JSONRenderer().render(payload))
+        orjson_time, orjson_output = self._measure(repeat, lambda: ORJSONRenderer().render(payload))
+
+        parsed = ORJSONParser().parse(_BytesStream(orjson_output))
+        round_trip = parsed == json.loads(stdlib_output)
+
+        self.stdout.write(f'📊 Payload {name} ({len(stdlib_output):,} bytes)')
+        self.stdout.write(f'   JSONRenderer:   {stdlib_time * 1000:.2f} ms')
+        self.stdout.write(f'   ORJSONRenderer: {orjson_time * 1000:.2f} ms')
+        self.stdout.write(f'   Aceleración: {stdlib_time / orjson_time:.1f}x')
+        if stdlib_output == orjson_output and round_trip:
+            self.stdout.write(self.style.SUCCESS('✅ Salida idéntica byte a byte'))
+        else:
+            self.stdout.write(self.style.ERROR('❌ La salida difiere entre ambos renderers'))
+
+    def _measure(self, repeat, func):
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+
+class _BytesStream:
+    """Stream mínimo para alimentar al parser"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
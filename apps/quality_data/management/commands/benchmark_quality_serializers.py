@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from agro_backend.fixtures import create_benchmark_rows
+from apps.quality_data.models import QualityData
+from apps.quality_data.serializers import QualityDataListSerializer, QualityDataListReader
+
+
+class Command(BaseCommand):
+    help = 'Compara filas/s de QualityDataListSerializer contra QualityDataListReader'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Número de registros a serializar'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Repeticiones por variante (se reporta la mejor)'
+        )
+        parser.add_argument(
+            '--empresa',
+            type=str,
+            default='BENCHMARK',
+            help='Empresa usada para los registros temporales'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        empresa = options['empresa']
+
+        with transaction.atomic():
+            create_benchmark_rows(empresa, rows)
+            queryset = QualityData.objects.filter(empresa=empresa).order_by('-fecha_registro')
+
+            drf_time, drf_data = self._measure(
+                options['repeat'],
+                lambda: QualityDataListSerializer(queryset, many=True).data
+            )
+            reader = QualityDataListReader()
+            reader_time, reader_data = self._measure(
+                options['repeat'],
+                lambda: reader.serialize(reader.project(queryset))
+            )
+
+            identical = [dict(item) for item in drf_data] == reader_data
+
+            # Descartar los registros temporales
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'📊 Registros serializados: {rows}')
+        self.stdout.write(f'   QualityDataListSerializer: {drf_time:.3f}s ({rows / drf_time:,.0f} filas/s)')
+        self.stdout.write(f'   QualityDataListReader:     {reader_time:.3f}s ({rows / reader_time:,.0f} filas/s)')
+        self.stdout.write(f'   Aceleración: {drf_time / reader_time:.1f}x')
+        if identical:
+            self.stdout.write(self.style.SUCCESS('✅ Salida idéntica en ambas rutas'))
+        else:
+            self.stdout.write(self.style.ERROR('❌ La salida difiere entre ambas rutas'))
+
+    def _measure(self, repeat, func):
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from sqlite_gevent import ConnectionPool, configure_connection, get_write_queue
+
+READ_QUERY = (
+    'SELECT id, empresa, fecha_registro, temperatura, ph FROM lectura '
+    'WHERE empresa = ? ORDER BY fecha_registro DESC LIMIT 50'
+)
+EMPRESAS = 8
+
+
+def create_benchmark_database(path, rows):
+    connection = configure_connection(sqlite3.connect(path))
+    connection.execute(
+        'CREATE TABLE lectura (id INTEGER PRIMARY KEY, empresa TEXT, fecha_registro TEXT, '
+        'temperatura REAL, ph REAL)'
+    )
+    connection.execute('CREATE INDEX lectura_empresa_fecha ON lectura (empresa, fecha_registro)')
+    connection.executemany(
+        'INSERT INTO lectura (empresa, fecha_registro, temperatura, ph) VALUES (?, ?, ?, ?)',
+        (
+            (f'Empresa {index % EMPRESAS}', f'2024-01-01T{index % 24:02d}:{index % 60:02d}:{index:08d}', 1.5, 3.2)
+            for index in range(rows)
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+# Antes: el sqlite_gevent anterior (lock global del proceso al abrir y
+# cerrar, locking_mode=EXCLUSIVE, una conexión por operación)
+_legacy_lock = threading.RLock()
+
+
+def _legacy_read(path, timeout, empresa):
+    with _legacy_lock:
+        connection = sqlite3.connect(path, timeout=timeout)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA cache_size=10000')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        connection.execute('PRAGMA locking_mode=EXCLUSIVE')
+    try:
+        return connection.execute(READ_QUERY, (empresa,)).fetchall()
+    finally:
+        with _legacy_lock:
+            connection.close()
+
+
+# Después: conexiones del pool, sin locks para leer
+def _pooled_read(pool, path, timeout, empresa):
+    connection = pool.acquire() or configure_connection(sqlite3.connect(path, timeout=timeout))
+    try:
+        return connection.execute(READ_QUERY, (empresa,)).fetchall()
+    finally:
+        pool.release(connection)
+
+
+def read_worker(mode, path, reads, timeout, start, results):
+    """Proceso que simula un worker de gunicorn haciendo `reads` lecturas"""
+    pool = ConnectionPool()
+    start.wait()
+    done = errors = 0
+    began = time.perf_counter()
+    for index in range(reads):
+        empresa = f'Empresa {index % EMPRESAS}'
+        try:
+            if mode == 'antes':
+                _legacy_read(path, timeout, empresa)
+            else:
+                _pooled_read(pool, path, timeout, empresa)
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put((done, errors, time.perf_counter() - began))
+    pool.close_all()
+
+
+def write_worker(mode, path, timeout, start, stop):
+    """Escritor concurrente: inserta una fila por transacción hasta `stop`"""
+    start.wait()
+    queue = get_write_queue(path)
+    while not stop.is_set():
+        try:
+            if mode == 'antes':
+                with _legacy_lock:
+                    connection = sqlite3.connect(path, timeout=timeout)
+                    connection.execute('PRAGMA locking_mode=EXCLUSIVE')
+            else:
+                connection = configure_connection(sqlite3.connect(path, timeout=timeout))
+            with queue.turn(timeout), connection:
+                connection.execute(
+                    'INSERT INTO lectura (empresa, fecha_registro, temperatura, ph) VALUES (?, ?, ?, ?)',
+                    ('Empresa 0', '2025-01-01T00:00:00', 1.0, 3.0),
+                )
+            connection.close()
+        except sqlite3.OperationalError:
+            pass
+        time.sleep(0.005)
+
+
+class Command(BaseCommand):
+    help = 'Mide lecturas concurrentes de SQLite con varios workers: conexión exclusiva anterior contra pool en WAL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Procesos lectores (como los workers de gunicorn)'
+        )
+        parser.add_argument(
+            '--reads',
+            type=int,
+            default=2000,
+            help='Lecturas por worker'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Filas de la tabla temporal'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=5.0,
+            help='Timeout de SQLite (segundos) antes de "database is locked"'
+        )
+        parser.add_argument(
+            '--writer',
+            action='store_true',
+            help='Agregar un proceso que escribe mientras se lee'
+        )
+
+    def handle(self, *args, **options):
+        # spawn: los procesos hijos no heredan el estado de gevent del padre
+        context = multiprocessing.get_context('spawn')
+
+        with tempfile.TemporaryDirectory() as directory:
+            throughput = {}
+            for mode in ('antes', 'después'):
+                path = os.path.join(directory, f'{mode}.sqlite3')
+                create_benchmark_database(path, options['rows'])
+                throughput[mode] = self._run(context, mode, path, options)
+
+        if throughput['antes']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Aceleración: {throughput['después'] / throughput['antes']:.1f}x"
+            ))
+
+    def _run(self, context, mode, path, options):
+        start = context.Event()
+        stop = context.Event()
+        results = context.Queue()
+        readers = [
+            context.Process(
+                target=read_worker,
+                args=(mode, path, options['reads'], options['timeout'], start, results),
+            )
+            for _ in range(options['workers'])
+        ]
+        writer = None
+        if options['writer']:
+            writer = context.Process(target=write_worker, args=(mode, path, options['timeout'], start, stop))
+            writer.start()
+        for process in readers:
+            process.start()
+
+        start.set()
+        outcomes = [results.get() for _ in readers]
+        stop.set()
+        for process in readers + ([writer] if writer else []):
+            process.join()
+
+        done = sum(outcome[0] for outcome in outcomes)
+        errors = sum(outcome[1] for outcome in outcomes)
+        elapsed = max(outcome[2] for outcome in outcomes)
+        rate = done / elapsed if elapsed else 0.0
+        self.stdout.write(f'📊 {mode} ({options["workers"]} workers)')
+        self.stdout.write(f'   Lecturas: {done:,} en {elapsed:.2f} s -> {rate:,.0f} lecturas/s')
+        if errors:
+            self.stdout.write(self.style.WARNING(f'   ⚠️ {errors:,} lecturas fallaron con "database is locked"'))
+        return rate
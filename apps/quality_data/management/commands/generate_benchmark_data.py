@@ -0,0 +1,308 @@
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.authentication.models import Company, Role, User
+from apps.production.models import Inspection, Product, QualityReport, Sample, Shipment
+from apps.quality_data.models import QualityData
+from apps.quality_data.services import DEFECT_FIELDS, ExternalQualityAPIService
+
+PASSWORD = 'benchmark-123'
+
+VARIEDADES = ['BILOXI', 'VENTURA', 'EMERALD', 'JUPITER', 'SEKOYA POP', 'BLUE MADEIRA']
+DESTINOS = ['USA', 'EUROPA', 'CHINA', 'UK', 'CANADA', 'ASIA']
+PRESENTACIONES = ['12x125g', '12x170g', '8x18oz', '6x250g', '12x4.4oz']
+TIPOS_CAJA = ['CLAMSHELL', 'CARTON', 'PUNNET']
+TURNOS = ['DIA', 'NOCHE']
+
+# Defectos de condición (el resto se considera defecto de calidad)
+CONDITION_DEFECTS = {
+    'HONGOS', 'EXUDACION', 'F. MOJADA', 'PUDRICION', 'SOBREMADURO',
+    'BLANDA SEVERA', 'BAYA COLAPSADA', 'BAYA REVENTADA', 'BLANDA MODERADO',
+    'DESHIDRATADO SEVERO', 'DESHIDRATACIÓN  LEVE', 'DESHIDRATACION MODERADO',
+}
+
+# Perfiles de lote: (probabilidad, defectos presentes (min, max), media por defecto %)
+LOT_PROFILES = [
+    (0.55, (0, 3), 0.4),   # lotes limpios
+    (0.30, (2, 6), 0.9),   # lotes normales
+    (0.12, (4, 10), 1.8),  # lotes con problemas
+    (0.03, (8, 16), 3.5),  # lotes rechazados
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos reproducibles para benchmarks: empresas, usuarios, '
+        'envíos, inspecciones, muestras y millones de registros QualityData'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10, help='Número de empresas')
+        parser.add_argument('--users-per-company', type=int, default=20, help='Usuarios por empresa')
+        parser.add_argument('--shipments', type=int, default=2000, help='Número de envíos')
+        parser.add_argument('--inspections-per-shipment', type=int, default=3, help='Inspecciones por envío')
+        parser.add_argument('--samples-per-inspection', type=int, default=2, help='Muestras por inspección')
+        parser.add_argument('--quality-rows', type=int, default=1000000, help='Registros QualityData')
+        parser.add_argument('--days', type=int, default=365, help='Días de historia a cubrir')
+        parser.add_argument(
+            '--end-date', type=str,
+            help='Último día con datos (YYYY-MM-DD, por defecto hoy). Fijarlo hace la corrida reproducible'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Semilla del generador aleatorio')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por bulk_create')
+        parser.add_argument(
+            '--transaction-size', type=int, default=100000,
+            help='Filas QualityData por transacción'
+        )
+        parser.add_argument('--prefix', type=str, default='BENCH', help='Prefijo de los datos generados')
+        parser.add_argument('--clear', action='store_true', help='Eliminar antes los datos con el mismo prefijo')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+
+        end_date = (
+            datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+            if options['end_date'] else timezone.localdate()
+        )
+        self.end = timezone.make_aware(datetime.combine(end_date, dt_time(23, 59, 59)))
+        self.start = self.end - timedelta(days=options['days'])
+
+        if options['clear']:
+            self._clear()
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            companies = self._create_companies()
+            users = self._create_users(companies)
+            shipments = self._create_shipments(users)
+            self._create_inspections(shipments)
+        self._create_quality_data(companies, users)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Datos de benchmark generados en {time.perf_counter() - started:.1f}s'
+        ))
+
+    # --- Limpieza ------------------------------------------------------------
+
+    def _clear(self):
+        companies = Company.objects.filter(name__startswith=f'{self.prefix} ')
+        self.stdout.write(f'🧹 Eliminando datos previos con prefijo {self.prefix}...')
+        with transaction.atomic():
+            QualityData.objects.filter(company__in=companies).delete()
+            Shipment.objects.filter(reference__startswith=f'{self.prefix}-').delete()
+            Product.objects.filter(description=self.prefix).delete()
+            User.objects.filter(company__in=companies).delete()
+            companies.delete()
+
+    # --- Empresas, usuarios y producción --------------------------------------
+
+    def _create_companies(self):
+        rubros = ['fruticultura', 'agricultura', 'agroindustria']
+        paises = ['PE', 'CL', 'MX', 'CO', 'AR']
+        companies = Company.objects.bulk_create([
+            Company(
+                name=f'{self.prefix} Empresa {index:03d}',
+                domain=f'{self.prefix.lower()}-empresa{index:03d}.com',
+                rubro=self.rng.choice(rubros),
+                pais=self.rng.choice(paises),
+            )
+            for index in range(self.options['companies'])
+        ])
+        self.stdout.write(f'🏢 {len(companies)} empresas')
+        return companies
+
+    def _create_users(self, companies):
+        roles = {
+            name: Role.objects.get_or_create(name=name)[0]
+            for name, _ in Role.ROLE_CHOICES
+        }
+        role_weights = [('admin', 1), ('manager', 2), ('operator', 6), ('supervisor', 3), ('viewer', 8)]
+        # Un solo hash para todos: PBKDF2 por usuario haría la generación inviable
+        password = make_password(PASSWORD)
+
+        users = []
+        for company_index, company in enumerate(companies):
+            for index in range(self.options['users_per_company']):
+                role = 'admin' if index == 0 else self.rng.choices(
+                    [name for name, _ in role_weights], [weight for _, weight in role_weights]
+                )[0]
+                username = f'{self.prefix.lower()}_{company_index:03d}_{index:04d}'
+                users.append(User(
+                    email=f'{username}@{company.domain}', username=username, password=password,
+                    first_name=f'Usuario {index}', last_name=company.name,
+                    company=company, role=roles[role], is_staff=index == 0,
+                    is_client=role == 'viewer',
+                ))
+        users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.stdout.write(f'👤 {len(users)} usuarios (contraseña: {PASSWORD})')
+        return users
+
+    def _create_shipments(self, users):
+        products = Product.objects.bulk_create([
+            Product(name='Arándano', variety=variety, description=self.prefix)
+            for variety in VARIEDADES
+        ])
+        transport = ['sea'] * 8 + ['air'] * 2 + ['road']
+        shipments = []
+        for index in range(self.options['shipments']):
+            shipments.append(Shipment(
+                reference=f'{self.prefix}-{index:07d}',
+                product=self.rng.choice(products),
+                shipper=f'Exportadora {index % 17}',
+                consignee=f'Importador {self.rng.choice(DESTINOS)}',
+                transport_type=self.rng.choice(transport),
+                location=self.rng.choice(['Callao', 'Paita', 'San Antonio', 'Manzanillo']),
+                date=self._random_datetime().date(),
+                created_by=self.rng.choice(users),
+            ))
+        shipments = Shipment.objects.bulk_create(shipments, batch_size=self.batch_size)
+        self.stdout.write(f'🚢 {len(shipments)} envíos')
+        return shipments
+
+    def _create_inspections(self, shipments):
+        inspection_types = [choice for choice, _ in Inspection.INSPECTION_TYPES]
+        statuses = ['completed'] * 6 + ['pending', 'in_progress', 'rejected']
+        overall = ['excellent', 'good', 'good', 'good', 'fair', 'poor']
+
+        inspections = []
+        for shipment in shipments:
+            for _ in range(self.options['inspections_per_shipment']):
+                inspections.append(Inspection(
+                    shipment=shipment,
+                    inspection_type=self.rng.choice(inspection_types),
+                    status=self.rng.choice(statuses),
+                    inspection_point=self.rng.choice(['Planta', 'Puerto', 'Campo']),
+                    inspector=f'Inspector {self.rng.randint(1, 40)}',
+                    inspection_date=self._random_datetime(),
+                ))
+        inspections = Inspection.objects.bulk_create(inspections, batch_size=self.batch_size)
+
+        reports = []
+        samples = []
+        for inspection in inspections:
+            quality = self.rng.choice(overall)
+            reports.append(QualityReport(
+                inspection=inspection,
+                temperature=round(self.rng.uniform(0.5, 4.5), 2),
+                humidity=round(self.rng.uniform(85, 95), 2),
+                ph_level=round(self.rng.uniform(2.8, 3.8), 2),
+                overall_quality=quality,
+                approved=quality in ('excellent', 'good'),
+            ))
+            for number in range(self.options['samples_per_inspection']):
+                samples.append(Sample(
+                    inspection=inspection,
+                    sample_id=f'M-{inspection.id}-{number}',
+                    quantity=round(self.rng.uniform(0.5, 3), 2),
+                    location_taken=self.rng.choice(['Cámara', 'Línea', 'Contenedor']),
+                ))
+        QualityReport.objects.bulk_create(reports, batch_size=self.batch_size)
+        Sample.objects.bulk_create(samples, batch_size=self.batch_size)
+        self.stdout.write(
+            f'🔍 {len(inspections)} inspecciones, {len(reports)} reportes y {len(samples)} muestras'
+        )
+
+    # --- Datos de calidad ------------------------------------------------------
+
+    def _create_quality_data(self, companies, users):
+        total = self.options['quality_rows']
+        chunk_size = self.options['transaction_size']
+        service = ExternalQualityAPIService()
+
+        # Distribución sesgada entre empresas (pocas empresas concentran la mayoría)
+        company_weights = [1 / (index + 1) for index in range(len(companies))]
+        users_by_company = {}
+        for user in users:
+            users_by_company.setdefault(user.company_id, []).append(user)
+
+        created = 0
+        started = time.perf_counter()
+        while created < total:
+            count = min(chunk_size, total - created)
+            with transaction.atomic():
+                objects = []
+                for index in range(created, created + count):
+                    company = self.rng.choices(companies, company_weights)[0]
+                    processed = service._process_external_data(self._external_record(company, index))
+                    objects.append(QualityData(
+                        **processed,
+                        temperatura=round(self.rng.gauss(2.0, 0.8), 2),
+                        humedad=round(self.rng.uniform(85, 95), 2),
+                        ph=round(self.rng.uniform(2.8, 3.8), 2),
+                        firmeza=round(self.rng.gauss(75, 10), 2),
+                        company=company,
+                        created_by=self.rng.choice(users_by_company[company.id]),
+                    ))
+                QualityData.objects.bulk_create(objects, batch_size=self.batch_size)
+            created += count
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'📊 {created:,}/{total:,} registros de calidad ({created / elapsed:,.0f} filas/s)')
+
+    def _external_record(self, company, index):
+        """Registro con la misma estructura que entrega la API externa"""
+        rng = self.rng
+        fecha = self._random_datetime()
+
+        profile = rng.choices(LOT_PROFILES, [weight for weight, _, _ in LOT_PROFILES])[0]
+        _, (minimum, maximum), mean = profile
+        defects = {
+            field: round(min(rng.expovariate(1 / mean), 25.0), 2)
+            for field in rng.sample(DEFECT_FIELDS, rng.randint(minimum, maximum))
+        }
+        total_calidad = round(sum(v for k, v in defects.items() if k not in CONDITION_DEFECTS), 2)
+        total_condicion = round(sum(v for k, v in defects.items() if k in CONDITION_DEFECTS), 2)
+        total_no_exportable = min(round(total_calidad + total_condicion, 2), 100.0)
+
+        variedad = rng.choice(VARIEDADES)
+        data = {
+            'EMPRESA': company.name,
+            'PRODUCTOR': company.name,
+            'FECHA DE MP': fecha.isoformat(),
+            'FECHA DE PROCESO': (fecha + timedelta(hours=rng.randint(2, 30))).isoformat(),
+            'SEMANA': fecha.isocalendar()[1],
+            'HORA': fecha.strftime('%H:%M'),
+            'TURNO': rng.choice(TURNOS),
+            'LINEA': f'L{rng.randint(1, 6)}',
+            'MODULO': f'M{rng.randint(1, 12)}',
+            'VIAJE': rng.randint(1, 40),
+            'FUNDO': f'FUNDO {rng.randint(1, 15)}',
+            'EVALUADOR': f'EVALUADOR {rng.randint(1, 25)}',
+            'VARIEDAD': variedad,
+            'DESTINO': rng.choice(DESTINOS),
+            'PRESENTACION': rng.choice(PRESENTACIONES),
+            'TIPO DE CAJA': rng.choice(TIPOS_CAJA),
+            'TIPO DE PRODUCTO': 'ORGANICO' if rng.random() < 0.2 else 'CONVENCIONAL',
+            'TRAZABILIDAD': f'{variedad[:3]}-{index:08d}',
+            'N° FCL': f'FCL{index // 500:06d}',
+            'PESO DE MUESTRA (g)': rng.choice([125, 170, 250, 500]),
+            'BRIX': round(rng.gauss(12.5, 1.3), 1),
+            'ACIDEZ': round(rng.uniform(0.3, 1.1), 2),
+            'CALIBRE': rng.choice(['<12mm', '12-14mm', '14-16mm', '16-18mm', '18-20mm', '>20mm']),
+            **defects,
+            'TOTAL DE DEFECTOS DE CALIDAD': total_calidad,
+            'TOTAL DE CONDICION': total_condicion,
+            'TOTAL DE NO EXPORTABLE': total_no_exportable,
+            'TOTAL DE EXPORTABLE': round(100 - total_no_exportable, 2),
+            'OBSERVACIONES': '' if rng.random() < 0.9 else 'Lote observado por inspector',
+        }
+        return {
+            'id': f'{self.prefix}-{index:09d}',
+            'processed_data': {
+                'data': data,
+                'row_index': index,
+                'processed_at': fecha.isoformat(),
+            },
+        }
+
+    def _random_datetime(self):
+        seconds = (self.end - self.start).total_seconds()
+        return self.start + timedelta(seconds=self.rng.uniform(0, seconds))
@@ -0,0 +1,342 @@
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from agro_backend.fixtures import add_shipments, create_benchmark_rows
+from apps.authentication.models import Company, Role, User
+from apps.production.models import Product
+from apps.quality_data.models import QualityData
+
+EMPRESA = 'Agro Load Test'
+ADMIN_EMAIL = 'admin@agroloadtest.com'
+PASSWORD = 'clave-carga-123'
+
+# Mezcla de tráfico: (nombre, peso, método, ruta, parámetros). Los parámetros
+# reciben el generador aleatorio y la cantidad de páginas sembradas por recurso
+TRAFFIC_MIX = [
+    ('login', 5, 'POST', '/api/auth/login/', None),
+    ('quality-data-list', 25, 'GET', '/api/quality-data/',
+     lambda rng, pages: {'page': rng.randint(1, min(pages['quality_data'], 5))}),
+    ('quality-data-filter', 15, 'GET', '/api/quality-data/filter/',
+     lambda rng, pages: {'calidad_general': rng.choice(QualityData.CALIDAD_CHOICES)[0]}),
+    ('quality-data-dashboard', 15, 'GET', '/api/quality-data/dashboard/', None),
+    ('quality-data-export', 5, 'GET', '/api/quality-data/export/', None),
+    ('shipments', 15, 'GET', '/api/shipments/',
+     lambda rng, pages: {'page': rng.randint(1, min(pages['shipments'], 3))}),
+    ('inspections', 10, 'GET', '/api/inspections/',
+     lambda rng, pages: {'page': rng.randint(1, min(pages['inspections'], 3))}),
+    ('products', 10, 'GET', '/api/products/', None),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta la aplicación con la configuración real de gunicorn/gevent sobre una '
+        'base SQLite sembrada, reproduce una mezcla de tráfico y reporta throughput y '
+        'latencias p50/p95/p99 por endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Registros QualityData a sembrar')
+        parser.add_argument('--shipments', type=int, default=200, help='Envíos a sembrar')
+        parser.add_argument('--users', type=int, default=20, help='Usuarios a sembrar')
+        parser.add_argument('--duration', type=float, default=30.0, help='Duración de la carga en segundos')
+        parser.add_argument('--warmup', type=float, default=3.0, help='Segundos de calentamiento (no se miden)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Clientes concurrentes')
+        parser.add_argument('--workers', type=int, help='Workers de gunicorn (por defecto los de gunicorn.conf.py)')
+        parser.add_argument('--port', type=int, default=8765, help='Puerto local del servidor')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de datos y de la mezcla de tráfico')
+        parser.add_argument('--output', type=str, help='Archivo JSON de resultados')
+        parser.add_argument('--baseline', type=str, help='JSON de una corrida anterior para comparar')
+        parser.add_argument('--keep-workdir', action='store_true', help='Conservar la base y los logs temporales')
+        parser.add_argument('--seed-only', action='store_true', help='Sólo siembra la base configurada (uso interno)')
+
+    def handle(self, *args, **options):
+        if options['seed_only']:
+            self._seed(options)
+            return
+
+        workdir = tempfile.mkdtemp(prefix='agro-loadtest-')
+        env = {
+            **os.environ,
+            'SQLITE_PATH': os.path.join(workdir, 'db.sqlite3'),
+            'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        }
+
+        self.stdout.write(f'🗄️ Preparando base de datos en {workdir}...')
+        self._manage(env, 'migrate', '--noinput', '-v', '0')
+        self._manage(
+            env, 'load_test', '--seed-only', '--rows', str(options['rows']),
+            '--shipments', str(options['shipments']), '--users', str(options['users']),
+            '--seed', str(options['seed']),
+        )
+
+        base_url = f"http://127.0.0.1:{options['port']}"
+        server = self._start_server(env, workdir, options)
+        try:
+            self._wait_for_server(base_url, server)
+            self.stdout.write(
+                f"🚀 Carga: {options['concurrency']} clientes durante {options['duration']:.0f}s"
+            )
+            samples, elapsed = self._run_load(base_url, options)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            if options['keep_workdir']:
+                self.stdout.write(f'📁 Base y logs conservados en {workdir}')
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        results = self._build_results(samples, elapsed, options)
+        self._report(results)
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'loadtest_results',
+            f"{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'local'}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as handle:
+            json.dump(results, handle, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'✅ Resultados guardados en {output}'))
+
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                self._compare(json.load(handle), results)
+
+    # --- Preparación ---------------------------------------------------------
+
+    def _manage(self, env, *args):
+        command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *args]
+        completed = subprocess.run(command, env=env, cwd=settings.BASE_DIR)
+        if completed.returncode != 0:
+            raise CommandError(f"Falló: manage.py {' '.join(args)}")
+
+    def _seed(self, options):
+        rng = random.Random(options['seed'])
+        password = make_password(PASSWORD)
+
+        with transaction.atomic():
+            roles = {
+                name: Role.objects.get_or_create(name=name)[0]
+                for name, _ in Role.ROLE_CHOICES
+            }
+            company = Company.objects.create(
+                name=EMPRESA, domain='agroloadtest.com', rubro='fruticultura', pais='PE'
+            )
+            admin = User.objects.create(
+                email=ADMIN_EMAIL, password=password, first_name='Admin', last_name='Carga',
+                company=company, role=roles['admin'], is_staff=True,
+            )
+            User.objects.bulk_create([
+                User(
+                    email=f'usuario{index}@agroloadtest.com', password=password,
+                    first_name=f'Usuario {index}', last_name='Carga', company=company,
+                    role=roles[rng.choice(['viewer', 'operator', 'manager'])],
+                )
+                for index in range(options['users'])
+            ])
+
+            product = Product.objects.create(name='Arándano', variety='Biloxi')
+            add_shipments(product, admin, options['shipments'])
+
+            create_benchmark_rows(EMPRESA, options['rows'], seed=options['seed'])
+            QualityData.objects.filter(empresa=EMPRESA).update(company=company)
+
+        self.stdout.write(
+            f"✅ Sembrados {options['rows']} registros de calidad, "
+            f"{options['shipments']} envíos y {options['users'] + 1} usuarios"
+        )
+
+    def _start_server(self, env, workdir, options):
+        command = [
+            sys.executable, '-m', 'gunicorn', 'gunicorn_async:application',
+            '-c', os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--access-logfile', os.path.join(workdir, 'access.log'),
+            '--error-logfile', os.path.join(workdir, 'error.log'),
+        ]
+        if options['workers']:
+            command += ['--workers', str(options['workers'])]
+        self.stdout.write('🔧 Iniciando gunicorn (gevent)...')
+        # La salida de la aplicación (prints de las vistas) va a un log aparte
+        log = open(os.path.join(workdir, 'server.log'), 'w')
+        return subprocess.Popen(
+            command, env=env, cwd=settings.BASE_DIR, stdout=log, stderr=subprocess.STDOUT
+        )
+
+    def _wait_for_server(self, base_url, server, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('gunicorn terminó antes de aceptar conexiones')
+            try:
+                requests.get(f'{base_url}/api/metrics', timeout=2)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.5)
+        raise CommandError('gunicorn no respondió a tiempo')
+
+    # --- Carga ---------------------------------------------------------------
+
+    def _login(self, session, base_url):
+        response = session.post(
+            f'{base_url}/api/auth/login/', json={'email': ADMIN_EMAIL, 'password': PASSWORD}
+        )
+        response.raise_for_status()
+        return response.json()['tokens']['access']
+
+    def _run_load(self, base_url, options):
+        samples = []
+        lock = threading.Lock()
+        weights = [entry[1] for entry in TRAFFIC_MIX]
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        pages = {
+            'quality_data': math.ceil(options['rows'] / page_size),
+            'shipments': math.ceil(options['shipments'] / page_size),
+            'inspections': math.ceil(options['shipments'] * 3 / page_size),
+        }
+        start = time.monotonic()
+        measure_from = start + options['warmup']
+        stop_at = measure_from + options['duration']
+
+        def client(number):
+            rng = random.Random(options['seed'] + number)
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = 'br, gzip'
+            session.headers['Authorization'] = f'Bearer {self._login(session, base_url)}'
+            local = []
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    break
+                name, _, method, path, params = rng.choices(TRAFFIC_MIX, weights)[0]
+                kwargs = {'timeout': 60}
+                if method == 'POST':
+                    kwargs['json'] = {'email': ADMIN_EMAIL, 'password': PASSWORD}
+                elif params:
+                    kwargs['params'] = params(rng, pages)
+                began = time.perf_counter()
+                try:
+                    response = session.request(method, f'{base_url}{path}', **kwargs)
+                    response.content
+                    status = response.status_code
+                except requests.RequestException:
+                    status = None
+                latency = time.perf_counter() - began
+                if now >= measure_from:
+                    local.append((name, latency, status))
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=client, args=(number,)) for number in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, options['duration']
+
+    # --- Resultados ----------------------------------------------------------
+
+    def _build_results(self, samples, elapsed, options):
+        endpoints = {}
+        for name, _, _, path, _ in TRAFFIC_MIX:
+            latencies = sorted(latency for sample, latency, _ in samples if sample == name)
+            errors = sum(
+                1 for sample, _, status in samples
+                if sample == name and (status is None or status >= 400)
+            )
+            endpoints[name] = _summarize(latencies, errors, elapsed)
+            endpoints[name]['path'] = path
+
+        all_latencies = sorted(latency for _, latency, _ in samples)
+        total_errors = sum(1 for _, _, status in samples if status is None or status >= 400)
+
+        return {
+            'commit': _git_commit(settings.BASE_DIR),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'config': {
+                key: options[key]
+                for key in ('rows', 'shipments', 'users', 'duration', 'warmup', 'concurrency', 'workers', 'seed')
+            },
+            'total': _summarize(all_latencies, total_errors, elapsed),
+            'endpoints': endpoints,
+        }
+
+    def _report(self, results):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'Endpoint':<26}{'Req':>7}{'Err':>6}{'Req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        rows = list(results['endpoints'].items()) + [('TOTAL', results['total'])]
+        for name, data in rows:
+            self.stdout.write(
+                f"{name:<26}{data['requests']:>7}{data['errors']:>6}{data['throughput']:>9.1f}"
+                f"{_ms(data['p50']):>9}{_ms(data['p95']):>9}{_ms(data['p99']):>9}"
+            )
+        self.stdout.write('')
+
+    def _compare(self, baseline, results):
+        self.stdout.write(f"📊 Comparación contra {baseline.get('commit') or 'baseline'}")
+        rows = list(results['endpoints'].items()) + [('TOTAL', results['total'])]
+        for name, data in rows:
+            before = baseline['total'] if name == 'TOTAL' else baseline['endpoints'].get(name)
+            if not before or not before['p95'] or not data['p95']:
+                continue
+            self.stdout.write(
+                f"{name:<26} req/s {before['throughput']:.1f} → {data['throughput']:.1f}   "
+                f"p95 {_ms(before['p95'])} → {_ms(data['p95'])} ms "
+                f"({(data['p95'] / before['p95'] - 1) * 100:+.0f}%)"
+            )
+
+
+def _percentile(values, percent):
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def _summarize(latencies, errors, elapsed):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+        'p50': _percentile(latencies, 50),
+        'p95': _percentile(latencies, 95),
+        'p99': _percentile(latencies, 99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f'{seconds * 1000:.1f}'
+
+
+def _git_commit(directory):
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=directory,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='qualitydata',
+            index=models.Index(fields=['company', 'updated_at'], name='quality_dat_company_da8a83_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:25
+
+from django.db import migrations, models
+
+
+def backfill_company(apps, schema_editor):
+    """
+    Asigna company_id según el nombre exacto de la empresa, que es el criterio
+    con el que se acotaban las vistas hasta ahora. También corrige los
+    registros ya enlazados a otra empresa: el save() anterior buscaba con
+    icontains y 'Agro Test' podía quedar en 'Agro Test Norte', que pasaría a
+    verlos al acotar por company_id. Sin empresa de nombre exacto, el enlace
+    existente se conserva.
+    """
+    Company = apps.get_model('authentication', 'Company')
+    QualityData = apps.get_model('quality_data', 'QualityData')
+
+    company_ids = {}
+    for company_id, name in Company.objects.order_by('-id').values_list('id', 'name'):
+        company_ids[name] = company_id  # ante nombres repetidos gana el id menor
+
+    for name, company_id in company_ids.items():
+        QualityData.objects.filter(empresa=name).exclude(company_id=company_id).update(company_id=company_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('quality_data', '0002_qualitydata_company_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_company, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='qualitydata',
+            index=models.Index(fields=['company', 'fecha_registro'], name='quality_dat_company_f9385e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='qualitydata',
+            index=models.Index(fields=['company', 'aprobado'], name='quality_dat_company_693903_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='qualitydata',
+            index=models.Index(fields=['company', 'calidad_general'], name='quality_dat_company_65f994_idx'),
+        ),
+    ]
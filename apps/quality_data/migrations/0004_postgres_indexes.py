@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# (nombre, método, expresión): solo PostgreSQL. No están en Meta.indexes para
+# que SQLite (que no admite GIN ni BRIN) no intente crearlos al reconstruir la tabla
+POSTGRES_INDEXES = (
+    # Contención (@>) sobre el JSON: búsqueda por record_id al sincronizar
+    ('quality_dat_process_gin', 'gin', 'processed_data jsonb_path_ops'),
+    # Rangos de fechas sin filtrar por empresa: los registros llegan en orden
+    # de fecha, así que un BRIN ocupa unas páginas frente a un B-tree completo
+    ('quality_dat_fecha_brin', 'brin', 'fecha_registro'),
+)
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('quality_data', 'QualityData')._meta.db_table)
+    for name, method, expression in POSTGRES_INDEXES:
+        # CONCURRENTLY: no bloquea las escrituras mientras se construye
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {schema_editor.quote_name(name)} '
+            f'ON {table} USING {method} ({expression})'
+        )
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('quality_data', '0003_company_scope_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.authentication.company_resolver import get_company_resolver
 from apps.authentication.models import Company
 
 User = get_user_model()
@@ -9,6 +10,14 @@ class QualityData(models.Model):
     """
     Modelo para almacenar datos de calidad de arándanos obtenidos de la API externa
     """
+    CALIDAD_CHOICES = [
+        ('excelente', 'Excelente'),
+        ('buena', 'Buena'),
+        ('regular', 'Regular'),
+        ('mala', 'Mala'),
+    ]
+    CALIDAD_LABELS = dict(CALIDAD_CHOICES)
+
     # Campos de identificación
     empresa = models.CharField(max_length=200, verbose_name="Empresa")
     fecha_registro = models.DateTimeField(verbose_name="Fecha de Registro")
@@ -85,12 +94,7 @@ class QualityData(models.Model):
     )
     calidad_general = models.CharField(
         max_length=20,
-        choices=[
-            ('excelente', 'Excelente'),
-            ('buena', 'Buena'),
-            ('regular', 'Regular'),
-            ('mala', 'Mala'),
-        ],
+        choices=CALIDAD_CHOICES,
         blank=True,
         verbose_name="Calidad General"
     )
@@ -141,6 +145,14 @@ class QualityData(models.Model):
             models.Index(fields=['fecha_registro']),
             models.Index(fields=['calidad_general']),
             models.Index(fields=['aprobado']),
+            # Scoping por empresa: rangos sobre prefijo entero company_id
+            models.Index(fields=['company', 'fecha_registro']),
+            models.Index(fields=['company', 'aprobado']),
+            models.Index(fields=['company', 'calidad_general']),
+            # Validadores de GET condicional: max(updated_at) por empresa
+            models.Index(fields=['company', 'updated_at']),
+            # En PostgreSQL además GIN sobre processed_data y BRIN sobre
+            # fecha_registro (migración 0004_postgres_indexes)
         ]
 
     def __str__(self):
@@ -148,13 +160,9 @@ class QualityData(models.Model):
 
     def save(self, *args, **kwargs):
         # Intentar asociar con una empresa del sistema si no está asignada
-        if not self.company and self.empresa:
-            try:
-                company = Company.objects.filter(name__icontains=self.empresa).first()
-                if company:
-                    self.company = company
-            except:
-                pass
+        # (mapa nombre normalizado -> id en memoria, sin consulta por fila)
+        if not self.company_id and self.empresa:
+            self.company_id = get_company_resolver().resolve(self.empresa)
         super().save(*args, **kwargs)
 
     @property
@@ -165,9 +173,7 @@ class QualityData(models.Model):
     @property
     def calidad_display(self):
         """Retorna la calidad general para mostrar"""
-        return dict(self._meta.get_field('calidad_general').choices).get(
-            self.calidad_general, self.calidad_general
-        )
+        return self.CALIDAD_LABELS.get(self.calidad_general, self.calidad_general)
 
     @property
     def aprobado_display(self):
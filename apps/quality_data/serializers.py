@@ -1,11 +1,62 @@
-from rest_framework import serializers
+import decimal
+
+from django.db.models.fields.json import KeyTransform
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import QualityData
 
 
-class QualityDataSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Permite recortar los campos del serializer con los argumentos
+    `fields` y `exclude` (usados por ?fields= y ?exclude= en las vistas)
+    """
+    # Columnas del modelo que necesita cada campo calculado
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        super().__init__(*args, **kwargs)
+
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+        if exclude:
+            for field_name in set(self.fields) & set(exclude):
+                self.fields.pop(field_name)
+
+    def get_required_columns(self):
+        """Retorna las columnas necesarias para el queryset .only()"""
+        columns = {'id'}
+        for field_name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if field_name in self.field_columns:
+                columns.update(self.field_columns[field_name])
+            elif isinstance(field, serializers.SerializerMethodField):
+                columns.add('processed_data')
+            else:
+                columns.add(field.source)
+        return columns
+
+
+QUALITY_DATA_FIELD_COLUMNS = {
+    'empresa_display': ('empresa', 'company'),
+    'calidad_display': ('calidad_general',),
+    'aprobado_display': ('aprobado',),
+    'company_name': ('company__name',),
+    'created_by_name': ('created_by__first_name', 'created_by__last_name'),
+}
+
+
+class QualityDataSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para datos de calidad
     """
+    field_columns = QUALITY_DATA_FIELD_COLUMNS
+
     empresa_display = serializers.ReadOnlyField()
     calidad_display = serializers.ReadOnlyField()
     aprobado_display = serializers.ReadOnlyField()
@@ -132,10 +183,12 @@ class QualityDataSerializer(serializers.ModelSerializer):
         return None
 
 
-class QualityDataListSerializer(serializers.ModelSerializer):
+class QualityDataListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listas de datos de calidad
     """
+    field_columns = QUALITY_DATA_FIELD_COLUMNS
+
     empresa_display = serializers.ReadOnlyField()
     calidad_display = serializers.ReadOnlyField()
     aprobado_display = serializers.ReadOnlyField()
@@ -243,6 +296,113 @@ class QualityDataListSerializer(serializers.ModelSerializer):
         return None
 
 
+class QualityDataListReader:
+    """
+    Ruta de lectura rápida equivalente a QualityDataListSerializer.
+    Proyecta con values() y convierte cada fila con funciones precompiladas,
+    sin instanciar campos DRF por fila. Produce el mismo JSON que el serializer
+    """
+    # Campos calculados desde processed_data['additional_info'] (campo -> clave)
+    additional_info_keys = {'contenedor': 'n_fcl'}
+
+    def __init__(self, fields=None, exclude=None):
+        serializer = QualityDataListSerializer(fields=fields, exclude=exclude)
+        self.columns = set()
+        self.converters = []
+        for field_name, field in serializer.fields.items():
+            self.converters.append((field_name, self._build_converter(field_name, field)))
+
+    def _build_converter(self, field_name, field):
+        if field_name == 'empresa_display':
+            self.columns.update(('empresa', 'company__name'))
+
+            # Igual que QualityData.empresa_display: "Sin empresa" solo si no hay company
+            def empresa_display(row):
+                if row['empresa']:
+                    return row['empresa']
+                return "Sin empresa" if row['company__name'] is None else row['company__name']
+            return empresa_display
+
+        if field_name == 'calidad_display':
+            self.columns.add('calidad_general')
+            labels = QualityData.CALIDAD_LABELS
+            return lambda row: labels.get(row['calidad_general'], row['calidad_general'])
+
+        if field_name == 'aprobado_display':
+            self.columns.add('aprobado')
+            return lambda row: "Sí" if row['aprobado'] else "No"
+
+        if isinstance(field, serializers.SerializerMethodField):
+            key = self.additional_info_keys.get(field_name, field_name)
+
+            def get_additional_info(row):
+                additional_info = row['additional_info']
+                return additional_info.get(key) if additional_info else None
+            return get_additional_info
+
+        source = field.source
+        self.columns.add(source)
+        if isinstance(field, serializers.DateTimeField):
+            return self._build_datetime_converter(source, field)
+        if isinstance(field, serializers.DecimalField):
+            return self._build_decimal_converter(source, field)
+        return lambda row: row[source]
+
+    def _build_datetime_converter(self, source, field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            to_representation = field.to_representation
+            return lambda row: to_representation(row[source])
+
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+        def convert(row):
+            value = row[source]
+            if not value:
+                return None
+            if field_timezone is not None:
+                value = value.astimezone(field_timezone)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+    def _build_decimal_converter(self, source, field):
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if not coerce_to_string or field.localize or field.decimal_places is None:
+            to_representation = field.to_representation
+            return lambda row: None if row[source] is None else to_representation(row[source])
+
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        rounding = field.rounding
+
+        def convert(row):
+            value = row[source]
+            if value is None:
+                return None
+            return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+        return convert
+
+    def project(self, queryset):
+        """Aplica la proyección values() necesaria para los campos seleccionados"""
+        return queryset.values(
+            *self.columns,
+            additional_info=KeyTransform('additional_info', 'processed_data')
+        )
+
+    def serialize(self, rows):
+        """Serializa un iterable de filas obtenidas con project()"""
+        converters = self.converters
+        return [
+            {field_name: convert(row) for field_name, convert in converters}
+            for row in rows
+        ]
+
+
 class QualityDataFilterSerializer(serializers.Serializer):
     """
     Serializer para filtros de datos de calidad
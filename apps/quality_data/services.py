@@ -6,10 +6,34 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 from django.conf import settings
 from django.core.cache import cache
+from apps.authentication.company_resolver import get_company_resolver
 from .models import QualityData
-from django.db.models import Avg, Count
+from django.db import connection
+from django.db.models import Avg, Count, Q
 from asgiref.sync import sync_to_async
 
+# Columnas de defectos (porcentaje) que entrega la API externa
+DEFECT_FIELDS = [
+    'DESGARRO', 'RESTOS FLORALES', 'EXCRETA DE ABEJA', 'HERIDA ABIERTA',
+    'HERIDA CICATRIZADA', 'FUMAGINA', 'MACHUCON', 'PICADO', 'RUSSET',
+    'QUERESA', 'OTROS', 'POLVO', 'HONGOS', 'OTROS2', 'F.BLOOM',
+    'EXUDACION', 'F. MOJADA', 'PUDRICION', 'HALO VERDE', 'SOBREMADURO',
+    'BAJO CALIBRE', 'BLANDA SEVERA', 'BAYA COLAPSADA', 'BAYA REVENTADA',
+    'DAÑO DE TRIPS', 'EXCRETA DE AVE', 'FRUTOS ROJIZOS', 'BLANDA MODERADO',
+    'CHANCHITO BLANCO', 'PRESENCIA DE LARVA', 'DESHIDRATADO SEVERO',
+    'FRUTOS CON PEDICELO', 'DESHIDRATACIÓN  LEVE', 'DESHIDRATACION MODERADO'
+]
+
+
+def record_id_filter(record_id):
+    """
+    Registro con ese record_id externo. En PostgreSQL se expresa como
+    contención (@>), que usa el índice GIN de processed_data; SQLite no
+    admite ese lookup y compara la clave
+    """
+    if connection.vendor == 'postgresql':
+        return Q(processed_data__contains={'additional_info': {'record_id': record_id}})
+    return Q(processed_data__additional_info__record_id=record_id)
 
 class ExternalQualityAPIService:
     """
@@ -379,13 +403,15 @@ class ExternalQualityAPIService:
             print(f"❌ Error inesperado (async): {str(e)}")
             return None
     
-    def sync_quality_data_for_company(self, empresa: str, user=None) -> Dict[str, Any]:
+    def sync_quality_data_for_company(self, empresa: str, user=None, company=None) -> Dict[str, Any]:
         """
         Sincroniza datos de calidad para una empresa específica
         
         Args:
             empresa: Nombre de la empresa
             user: Usuario que realiza la sincronización
+            company: Empresa del sistema a la que pertenecen los registros
+                (opcional; si no se indica se resuelve por nombre)
             
         Returns:
             Diccionario con el resultado de la sincronización
@@ -408,10 +434,15 @@ class ExternalQualityAPIService:
         records_created = 0
         records_updated = 0
         
+        # Resolver la empresa del sistema una sola vez para todo el lote
+        company_id = company.id if company is not None else get_company_resolver().resolve(empresa)
+        
         for data_item in external_data:
             try:
                 # Procesar y mapear los datos
                 processed_data = self._process_external_data(data_item)
+                if company_id is not None:
+                    processed_data['company_id'] = company_id
                 
                 # Intentar identificar de forma única por record_id del sistema externo
                 record_id = processed_data.get('processed_data', {}).get('additional_info', {}).get('record_id')
@@ -419,8 +450,7 @@ class ExternalQualityAPIService:
                 created = False
                 if record_id:
                     quality_data = QualityData.objects.filter(
-                        empresa=empresa,
-                        processed_data__additional_info__record_id=record_id
+                        record_id_filter(record_id), empresa=empresa
                     ).first()
                 
                 if quality_data is None:
@@ -469,13 +499,15 @@ class ExternalQualityAPIService:
         print(f"✅ Sincronización completada: {result}")
         return result
     
-    async def sync_quality_data_for_company_async(self, empresa: str, user=None) -> Dict[str, Any]:
+    async def sync_quality_data_for_company_async(self, empresa: str, user=None, company=None) -> Dict[str, Any]:
         """
         Versión async para sincronizar datos de calidad para una empresa específica
         
         Args:
             empresa: Nombre de la empresa
             user: Usuario que realiza la sincronización
+            company: Empresa del sistema a la que pertenecen los registros
+                (opcional; si no se indica se resuelve por nombre)
             
         Returns:
             Diccionario con el resultado de la sincronización
@@ -498,11 +530,19 @@ class ExternalQualityAPIService:
         records_created = 0
         records_updated = 0
         
+        # Resolver la empresa del sistema una sola vez para todo el lote
+        if company is not None:
+            company_id = company.id
+        else:
+            company_id = await sync_to_async(get_company_resolver().resolve)(empresa)
+        
         # Procesar registros de forma async
         for data_item in external_data:
             try:
                 # Procesar y mapear los datos
                 processed_data = self._process_external_data(data_item)
+                if company_id is not None:
+                    processed_data['company_id'] = company_id
                 
                 # Buscar registro existente o crear uno nuevo de forma async
                 quality_data, created = await sync_to_async(QualityData.objects.get_or_create)(
@@ -600,18 +640,7 @@ class ExternalQualityAPIService:
         
         # Crear descripción de defectos
         defectos_desc = []
-        defectos_campos = [
-            'DESGARRO', 'RESTOS FLORALES', 'EXCRETA DE ABEJA', 'HERIDA ABIERTA',
-            'HERIDA CICATRIZADA', 'FUMAGINA', 'MACHUCON', 'PICADO', 'RUSSET',
-            'QUERESA', 'OTROS', 'POLVO', 'HONGOS', 'OTROS2', 'F.BLOOM',
-            'EXUDACION', 'F. MOJADA', 'PUDRICION', 'HALO VERDE', 'SOBREMADURO',
-            'BAJO CALIBRE', 'BLANDA SEVERA', 'BAYA COLAPSADA', 'BAYA REVENTADA',
-            'DAÑO DE TRIPS', 'EXCRETA DE AVE', 'FRUTOS ROJIZOS', 'BLANDA MODERADO',
-            'CHANCHITO BLANCO', 'PRESENCIA DE LARVA', 'DESHIDRATADO SEVERO',
-            'FRUTOS CON PEDICELO', 'DESHIDRATACIÓN  LEVE', 'DESHIDRATACION MODERADO'
-        ]
-        
-        for campo in defectos_campos:
+        for campo in DEFECT_FIELDS:
             valor = data.get(campo)
             if valor and valor > 0:
                 defectos_desc.append(f"{campo}: {valor}%")
@@ -715,19 +744,21 @@ class QualityDataService:
         Returns:
             Lista de datos de calidad
         """
-        if not user or not user.company:
+        if not user or not user.is_authenticated or not user.company_id:
             return QualityData.objects.none()
         
-        return QualityData.objects.filter(empresa=user.company.name).order_by('-fecha_registro')
+        # Scoping por company_id (índices compuestos con prefijo entero)
+        return QualityData.objects.filter(company_id=user.company_id).order_by('-fecha_registro')
     
     @staticmethod
-    def get_quality_stats(user=None, empresa=None) -> Dict[str, Any]:
+    def get_quality_stats(user=None, empresa=None, company_id=None) -> Dict[str, Any]:
         """
         Obtiene estadísticas de calidad
         
         Args:
             user: Usuario autenticado
-            empresa: Empresa específica (opcional)
+            empresa: Nombre de empresa específica (opcional)
+            company_id: Empresa del sistema (opcional, tiene prioridad)
             
         Returns:
             Diccionario con estadísticas
@@ -735,10 +766,12 @@ class QualityDataService:
         queryset = QualityData.objects.all()
         
         # Filtrar por empresa del usuario si no se especifica otra
-        if empresa:
+        if company_id:
+            queryset = queryset.filter(company_id=company_id)
+        elif empresa:
             queryset = queryset.filter(empresa=empresa)
-        elif user and user.company:
-            queryset = queryset.filter(empresa=user.company.name)
+        elif user and user.company_id:
+            queryset = queryset.filter(company_id=user.company_id)
         
         total_registros = queryset.count()
         registros_aprobados = queryset.filter(aprobado=True).count()
@@ -0,0 +1,269 @@
+"""
+Presupuesto de consultas de los endpoints de datos de calidad
+"""
+from unittest import mock
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from agro_backend.testing import QueryBudgetTestCase, add_quality_data
+from apps.authentication.authentication import get_user_context_cache
+from apps.authentication.company_resolver import get_company_resolver
+from apps.authentication.models import Company
+from apps.quality_data.models import QualityData
+from apps.quality_data.serializers import QualityDataListReader, QualityDataListSerializer
+from apps.quality_data.services import ExternalQualityAPIService, record_id_filter
+from apps.quality_data.views import QualityDataBatchCreateView
+
+
+class QualityDataQueryBudgetTests(QueryBudgetTestCase):
+
+    def grow(self):
+        add_quality_data(self.data['company'], 5)
+
+    def test_list(self):
+        self.assertPaginatedBudget(3, reverse('quality_data:quality-data-list'))
+
+    def test_detail(self):
+        url = reverse('quality_data:quality-data-detail', args=[QualityData.objects.first().id])
+        self.assertQueryBudget(2, url)
+
+    def test_list_not_modified(self):
+        url = reverse('quality_data:quality-data-list')
+        first = self.client.get(url)
+        self.assertNotIn('Last-Modified', first)
+        # Validador antes de serializar: auth sin consultas + agregado
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Borrar una fila que no es la más reciente cambia el ETag
+        QualityData.objects.order_by('fecha_registro', 'updated_at').first().delete()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_detail_not_modified(self):
+        record = QualityData.objects.first()
+        url = reverse('quality_data:quality-data-detail', args=[record.id])
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304
+        )
+        record.temperatura = '9.90'
+        record.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_sparse_fieldset(self):
+        url = reverse('quality_data:quality-data-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,temperatura,contenedor'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'temperatura', 'contenedor'})
+        # La proyección SQL también se recorta: solo processed_data para contenedor
+        self.assertNotIn('"ph"', queries[-1]['sql'])
+        self.assertNotIn('"empresa"', queries[-1]['sql'])
+
+        response = self.client.get(url, {'exclude': 'contenedor,empresa_display'})
+        full = self.client.get(url).data['results'][0]
+        self.assertEqual(set(response.data['results'][0]), set(full) - {'contenedor', 'empresa_display'})
+
+    def test_list_reader_matches_serializer(self):
+        unnamed = Company.objects.create(name='', domain='sin-nombre.com', rubro='otros', pais='PE')
+        add_quality_data(self.data['company'], 3)
+        first, second, third = QualityData.objects.order_by('-id')[:3]
+        QualityData.objects.filter(id=first.id).update(empresa='', processed_data={}, temperatura=None)
+        QualityData.objects.filter(id=second.id).update(empresa='', company=None)
+        QualityData.objects.filter(id=third.id).update(empresa='', company=unnamed)
+
+        queryset = QualityData.objects.select_related('company').order_by('id')
+        reader = QualityDataListReader()
+        self.assertEqual(
+            reader.serialize(reader.project(queryset)),
+            QualityDataListSerializer(queryset, many=True).data,
+        )
+
+    def test_filter(self):
+        # El filtro aplica aprobado=False por defecto: sólo la mitad de las filas
+        self.assertPaginatedBudget(
+            3, reverse('quality_data:quality-data-filter'), page_sizes=(2, self.rows // 2)
+        )
+
+    def test_stats(self):
+        self.assertConstantBudget(7, reverse('quality_data:quality-data-stats'), self.grow)
+
+    def test_dashboard(self):
+        self.assertConstantBudget(16, reverse('quality_data:quality-data-dashboard'), self.grow)
+
+    def test_export(self):
+        self.assertConstantBudget(2, reverse('quality_data:quality-data-export'), self.grow)
+
+    def test_sync(self):
+        # La API externa se reemplaza por un payload fijo; cada registro
+        # sincronizado implica escrituras, así que el presupuesto es por payload
+        records = [
+            {'data': {'EMPRESA': 'Agro Test', 'FECHA DE MP': f'2024-01-0{day}T08:00:00Z', 'BRIX': 12}}
+            for day in range(1, 4)
+        ]
+        with mock.patch.object(
+            ExternalQualityAPIService, 'get_all_quality_data_by_company', return_value=records
+        ):
+            self.assertQueryBudget(12, reverse('quality_data:quality-data-sync'), method='post')
+
+    def test_list_scoped_by_company(self):
+        # Un registro con el mismo nombre de empresa pero de otra empresa del sistema
+        add_quality_data(self.data['other_company'], 1)
+        QualityData.objects.filter(company=self.data['other_company']).update(
+            empresa=self.data['company'].name
+        )
+        response = self.client.get(reverse('quality_data:quality-data-list'))
+        self.assertEqual(response.data['count'], self.rows)
+
+    def test_claims_authentication_without_user_context(self):
+        # Empresa y rol vienen en el token: la caché de usuarios no interviene
+        get_user_context_cache().clear()
+        self.assertPaginatedBudget(3, reverse('quality_data:quality-data-list'))
+        self.assertQueryBudget(7, reverse('quality_data:quality-data-stats'))
+
+    def test_token_without_claims_loads_user(self):
+        get_user_context_cache().clear()
+        token = RefreshToken.for_user(self.data['admin']).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.assertQueryBudget(3 + 1, reverse('quality_data:quality-data-list'))
+        self.assertEqual(response.data['count'], self.rows)
+
+    def test_create_assigns_user_and_company(self):
+        response = self.client.post(
+            reverse('quality_data:quality-data-list'),
+            {'empresa': 'Agro Test', 'fecha_registro': timezone.now().isoformat()},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        record = QualityData.objects.get(id=response.data['id'])
+        self.assertEqual(record.created_by_id, self.data['admin'].id)
+        self.assertEqual(record.company_id, self.data['company'].id)
+
+    def test_writes_reject_deactivated_user(self):
+        user = self.data['admin']
+        user.is_active = False
+        user.save()
+        record = QualityData.objects.first()
+        detail = reverse('quality_data:quality-data-detail', args=[record.id])
+        now = timezone.now().isoformat()
+        writes = (
+            ('post', reverse('quality_data:quality-data-list'), {'empresa': 'Agro Test', 'fecha_registro': now}),
+            ('post', reverse('quality_data:quality-data-batch'), self.batch_records(1)),
+            ('patch', detail, {'aprobado': False}),
+            ('delete', detail, None),
+        )
+        for method, url, data in writes:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data, format='json')
+                self.assertEqual(response.status_code, 401)
+        self.assertTrue(QualityData.objects.filter(id=record.id).exists())
+        # Las lecturas valen con los claims hasta que expira el access token
+        self.assertEqual(self.client.get(detail).status_code, 200)
+
+    def test_save_resolves_company_from_memory(self):
+        get_company_resolver().invalidate()
+        get_company_resolver().resolve('precarga')
+        # Sólo el INSERT: el nombre (normalizado) se resuelve sin consultar Company
+        with self.assertNumQueries(1):
+            record = QualityData.objects.create(empresa='  AGRO   test ', fecha_registro=timezone.now())
+        self.assertEqual(record.company_id, self.data['company'].id)
+
+    def batch_records(self, count, empresa='Agro Test'):
+        now = timezone.now().isoformat()
+        return [
+            {'empresa': empresa, 'fecha_registro': now, 'temperatura': '1.20', 'calidad_general': 'buena'}
+            for _ in range(count)
+        ]
+
+    def test_batch_create_budget(self):
+        url = reverse('quality_data:quality-data-batch')
+        # Un bloque: savepoint + INSERT + release, sin importar el tamaño
+        response = self.assertQueryBudget(3, url, method='post', data=self.batch_records(20), status=201)
+        self.assertEqual(response.data['created'], 20)
+        # 25 registros en bloques de 10 -> tres transacciones
+        with mock.patch.object(QualityDataBatchCreateView, 'bulk_chunk_size', 10):
+            self.assertQueryBudget(9, url, method='post', data=self.batch_records(25), status=201)
+        records = QualityData.objects.filter(id__in=[result['id'] for result in response.data['results']])
+        self.assertEqual(set(records.values_list('company_id', 'created_by_id')),
+                         {(self.data['company'].id, self.data['admin'].id)})
+
+    def test_batch_create_reports_errors_per_record(self):
+        records = self.batch_records(3)
+        records[1].pop('fecha_registro')
+        records[2]['calidad_general'] = 'no-existe'
+        response = self.client.post(reverse('quality_data:quality-data-batch'), records, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'error', 'error'])
+        self.assertIn('fecha_registro', response.data['results'][1]['errors'])
+        self.assertIn('calidad_general', response.data['results'][2]['errors'])
+
+    def test_batch_create_resolves_companies_once(self):
+        user = self.data['admin']
+        user.company = None
+        user.save()
+        self.authenticate(user)
+        get_company_resolver().invalidate()
+        records = self.batch_records(2) + self.batch_records(2, empresa='OTRA empresa') + self.batch_records(1, 'Nadie')
+        with mock.patch('apps.quality_data.models.QualityData.save') as save:
+            response = self.client.post(reverse('quality_data:quality-data-batch'), records, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        save.assert_not_called()
+        ids = [result['id'] for result in response.data['results']]
+        companies = dict(QualityData.objects.filter(id__in=ids).values_list('id', 'company_id'))
+        self.assertEqual(
+            [companies[record_id] for record_id in ids],
+            [self.data['company'].id] * 2 + [self.data['other_company'].id] * 2 + [None],
+        )
+
+    def test_metrics(self):
+        self.assertQueryBudget(0, reverse('metrics'))
+
+    def test_record_id_filter(self):
+        record = QualityData.objects.first()
+        record.processed_data = {'additional_info': {'record_id': 4242, 'destino': 'USA'}}
+        record.save()
+        self.assertEqual(list(QualityData.objects.filter(record_id_filter(4242))), [record])
+        self.assertFalse(QualityData.objects.filter(record_id_filter(4243)).exists())
+
+
+class CompanyBackfillMigrationTests(TransactionTestCase):
+    """0003_company_scope_indexes: company_id desde el nombre exacto de la empresa"""
+    migrate_from = [('quality_data', '0002_qualitydata_company_updated_at_index')]
+    migrate_to = [('quality_data', '0003_company_scope_indexes')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+
+    def setUp(self):
+        self.migrate(self.migrate_from)
+        self.addCleanup(self.migrate, MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfill_repoints_links_from_icontains(self):
+        exact = Company.objects.create(name='Agro Test', domain='agrotest.com', rubro='fruticultura', pais='PE')
+        similar = Company.objects.create(name='Agro Test Norte', domain='norte.com', rubro='otros', pais='PE')
+        wrong, missing, unmatched = [
+            QualityData.objects.create(empresa=empresa, fecha_registro=timezone.now())
+            for empresa in ('Agro Test', 'Agro Test', 'Agro Test Sur')
+        ]
+        # Enlaces que dejaba el save() anterior (name__icontains)
+        QualityData.objects.filter(id__in=[wrong.id, unmatched.id]).update(company=similar)
+        QualityData.objects.filter(id=missing.id).update(company=None)
+
+        self.migrate(self.migrate_to)
+
+        companies = dict(QualityData.objects.values_list('id', 'company_id'))
+        self.assertEqual(companies[wrong.id], exact.id)
+        self.assertEqual(companies[missing.id], exact.id)
+        # Sin empresa de nombre exacto se conserva el enlace
+        self.assertEqual(companies[unmatched.id], similar.id)
@@ -7,6 +7,7 @@ urlpatterns = [
     # Vistas principales
     path('quality-data/', views.QualityDataListCreateView.as_view(), name='quality-data-list'),
     path('quality-data/<int:pk>/', views.QualityDataDetailView.as_view(), name='quality-data-detail'),
+    path('quality-data/batch/', views.QualityDataBatchCreateView.as_view(), name='quality-data-batch'),
     
     # Vistas de filtrado y búsqueda
     path('quality-data/filter/', views.QualityDataFilterView.as_view(), name='quality-data-filter'),
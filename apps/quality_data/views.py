@@ -1,23 +1,155 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Q, Max, Count
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from datetime import datetime, timedelta
 import asyncio
+import hashlib
 from asgiref.sync import sync_to_async
 from django.db import transaction
 
+from agro_backend.bulk import BulkCreateMixin
+from apps.authentication.authentication import ClaimsJWTAuthentication, ClaimsReadAuthenticationMixin
+from apps.authentication.company_resolver import get_company_resolver
+
 from .models import QualityData
 from .serializers import (
     QualityDataSerializer, QualityDataListSerializer, 
-    QualityDataFilterSerializer, QualityDataStatsSerializer
+    QualityDataFilterSerializer, QualityDataStatsSerializer, QualityDataListReader
 )
 from .services import ExternalQualityAPIService, QualityDataService
 
 
-class QualityDataListCreateView(generics.ListCreateAPIView):
+def _parse_field_list(value):
+    """Convierte 'a,b,c' en una lista de nombres de campo"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()] or None
+
+
+class SparseFieldsetMixin:
+    """
+    Soporte para ?fields= y ?exclude= en vistas de datos de calidad.
+    Recorta tanto la salida del serializer como la proyección SQL (.only())
+    """
+
+    def get_sparse_fieldset(self):
+        if self.request.method != 'GET':
+            return {}
+        fieldset = {}
+        fields = _parse_field_list(self.request.query_params.get('fields'))
+        exclude = _parse_field_list(self.request.query_params.get('exclude'))
+        if fields:
+            fieldset['fields'] = fields
+        if exclude:
+            fieldset['exclude'] = exclude
+        return fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        for key, value in self.get_sparse_fieldset().items():
+            kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != 'GET':
+            return queryset
+
+        serializer = self.get_serializer_class()(**self.get_sparse_fieldset())
+        columns = serializer.get_required_columns()
+        related = {column.split('__')[0] for column in columns if '__' in column}
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns, *related)
+
+
+class QualityDataFastListMixin:
+    """
+    Lista con QualityDataListReader (values() + conversores precompilados)
+    en lugar de instanciar QualityDataListSerializer por fila
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        reader = QualityDataListReader(**self.get_sparse_fieldset())
+        rows = reader.project(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
+
+
+class ConditionalGetMixin:
+    """
+    Validadores baratos para listas y detalle, evaluados antes de serializar:
+    - lista: solo ETag, de max(updated_at) + count del queryset filtrado (una
+      consulta agregada). Sin Last-Modified: borrar una fila que no es la más
+      reciente no lo cambia, e If-Modified-Since daría un 304 obsoleto
+    - detalle: ETag y Last-Modified del updated_at de la fila
+    """
+
+    def _build_etag(self, request, *parts):
+        key = '|'.join(str(part) for part in (request.get_full_path(), *parts))
+        return quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+    def _conditional_response(self, request, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def _set_validators(self, response, etag, last_modified):
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id'),
+        )
+        etag = self._build_etag(
+            request, request.user.company_id, validators['count'], validators['last_modified']
+        )
+
+        not_modified = self._conditional_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        return self._set_validators(response, etag, None)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .order_by()
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self._build_etag(request, last_modified)
+        not_modified = self._conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().retrieve(request, *args, **kwargs)
+        return self._set_validators(response, etag, last_modified)
+
+
+class QualityDataListCreateView(ClaimsReadAuthenticationMixin, ConditionalGetMixin, QualityDataFastListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     """
     Vista para listar y crear datos de calidad
     """
@@ -32,16 +164,11 @@ class QualityDataListCreateView(generics.ListCreateAPIView):
         """
         Retorna datos de calidad filtrados por empresa del usuario logueado
         """
-        queryset = QualityData.objects.all()
-        
-        # Filtrar por empresa del usuario logueado
-        if self.request.user.is_authenticated and self.request.user.company:
-            user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
-            print(f"🔍 Filtrando por empresa del usuario: {user_company}")
+        # Filtrar por empresa del usuario logueado (vacío si no tiene empresa)
+        queryset = QualityDataService.get_quality_data_for_user_company(self.request.user)
+        if self.request.user.is_authenticated and self.request.user.company_id:
+            print(f"🔍 Filtrando por empresa del usuario: {self.request.user.company_id}")
         else:
-            # Si el usuario no tiene empresa asignada, no mostrar datos
-            queryset = QualityData.objects.none()
             print("⚠️ Usuario sin empresa asignada - no se muestran datos")
         
         # Aplicar filtros adicionales
@@ -87,12 +214,40 @@ class QualityDataListCreateView(generics.ListCreateAPIView):
         Asigna el usuario creador al guardar (si está autenticado)
         """
         if self.request.user.is_authenticated:
-            serializer.save(created_by=self.request.user)
+            # El registro pertenece a la empresa de quien lo crea
+            serializer.save(created_by_id=self.request.user.id, company_id=self.request.user.company_id)
         else:
             serializer.save()
 
 
-class QualityDataDetailView(generics.RetrieveUpdateDestroyAPIView):
+class QualityDataBatchCreateView(BulkCreateMixin, generics.GenericAPIView):
+    """
+    Crea un lote de datos de calidad (POST con una lista). Cada bloque de
+    `bulk_chunk_size` registros va en su propia transacción: un error en uno
+    no descarta los demás
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = QualityDataSerializer
+    bulk_chunk_size = 200
+
+    def prepare_bulk_data(self, validated_items):
+        """
+        Igual que perform_create: la empresa es la del usuario. Sin empresa,
+        se resuelve por nombre una vez para todo el lote (bulk_create no llama a save())
+        """
+        company_id = self.request.user.company_id
+        if company_id:
+            companies = {}
+        else:
+            companies = get_company_resolver().resolve_many({data.get('empresa') for data in validated_items})
+        for data in validated_items:
+            data.pop('company', None)
+            data.pop('created_by', None)
+            data['company_id'] = company_id or companies.get(data.get('empresa'))
+            data['created_by_id'] = self.request.user.id
+
+
+class QualityDataDetailView(ClaimsReadAuthenticationMixin, ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vista para ver, actualizar y eliminar datos de calidad específicos
     """
@@ -103,23 +258,15 @@ class QualityDataDetailView(generics.RetrieveUpdateDestroyAPIView):
         """
         Retorna datos de calidad filtrados por empresa del usuario logueado
         """
-        queryset = QualityData.objects.all()
-        
-        # Filtrar por empresa del usuario logueado
-        if self.request.user.is_authenticated and self.request.user.company:
-            user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
-        else:
-            # Si el usuario no tiene empresa asignada, no mostrar datos
-            queryset = QualityData.objects.none()
-        
-        return queryset
+        # Filtrar por empresa del usuario logueado (vacío si no tiene empresa)
+        return QualityDataService.get_quality_data_for_user_company(self.request.user)
 
 
-class QualityDataFilterView(generics.ListAPIView):
+class QualityDataFilterView(ConditionalGetMixin, QualityDataFastListMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     Vista para filtrar datos de calidad con parámetros avanzados
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]  # Cambiado de AllowAny a IsAuthenticated
     serializer_class = QualityDataListSerializer
     
@@ -127,15 +274,8 @@ class QualityDataFilterView(generics.ListAPIView):
         """
         Retorna datos de calidad filtrados por empresa del usuario logueado
         """
-        queryset = QualityData.objects.all()
-        
-        # Filtrar por empresa del usuario logueado
-        if self.request.user.is_authenticated and self.request.user.company:
-            user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
-        else:
-            # Si el usuario no tiene empresa asignada, no mostrar datos
-            queryset = QualityData.objects.none()
+        # Filtrar por empresa del usuario logueado (vacío si no tiene empresa)
+        queryset = QualityDataService.get_quality_data_for_user_company(self.request.user)
         
         # Aplicar filtros del serializer
         filter_serializer = QualityDataFilterSerializer(data=self.request.query_params)
@@ -161,18 +301,14 @@ class QualityDataFilterView(generics.ListAPIView):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_stats(request):
     """
     Obtiene estadísticas de datos de calidad filtradas por empresa del usuario
     """
-    # Usar la empresa del usuario logueado
-    user_company = None
-    if request.user.is_authenticated and request.user.company:
-        user_company = request.user.company.name
-    
-    # Usar el servicio de forma síncrona
-    stats = QualityDataService.get_quality_stats(user=request.user, empresa=user_company)
+    # Usar el servicio de forma síncrona, acotado a la empresa del usuario
+    stats = QualityDataService.get_quality_stats(user=request.user, company_id=request.user.company_id)
     
     serializer = QualityDataStatsSerializer(stats)
     return Response(serializer.data)
@@ -191,14 +327,16 @@ def sync_external_quality_data(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    user_company = request.user.company.name
+    user_company = request.user.company
     
     try:
         # Crear servicio de API externa
         external_service = ExternalQualityAPIService()
         
         # Sincronizar datos de forma síncrona para la empresa del usuario
-        result = external_service.sync_quality_data_for_company(user_company, request.user)
+        result = external_service.sync_quality_data_for_company(
+            user_company.name, request.user, company=user_company
+        )
         
         if result['success']:
             return Response({
@@ -221,63 +359,54 @@ def sync_external_quality_data(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_dashboard(request):
     """
     Obtiene datos para el dashboard de calidad filtrados por empresa del usuario
     """
     # Usar la empresa del usuario logueado
-    user_company = None
-    if request.user.is_authenticated and request.user.company:
-        user_company = request.user.company.name
+    company_id = request.user.company_id
     
     # Obtener estadísticas generales de forma síncrona
-    stats = QualityDataService.get_quality_stats(user=request.user, empresa=user_company)
+    stats = QualityDataService.get_quality_stats(user=request.user, company_id=company_id)
     
     # Obtener datos recientes de forma síncrona filtrados por empresa
     recent_data = QualityData.objects.all()
-    if user_company:
-        recent_data = recent_data.filter(empresa=user_company)
+    if company_id:
+        recent_data = recent_data.filter(company_id=company_id)
     recent_data = recent_data.order_by('-fecha_registro')[:10]
-    recent_data_serializer = QualityDataListSerializer(recent_data, many=True)
+    reader = QualityDataListReader()
+    recent_data = reader.serialize(reader.project(recent_data))
     
     # Obtener datos por período (últimos 30 días) de forma síncrona
     thirty_days_ago = timezone.now() - timedelta(days=30)
     monthly_data = QualityData.objects.filter(
         fecha_registro__gte=thirty_days_ago
     )
-    if user_company:
-        monthly_data = monthly_data.filter(empresa=user_company)
+    if company_id:
+        monthly_data = monthly_data.filter(company_id=company_id)
     monthly_data = monthly_data.order_by('-fecha_registro')
     
-    monthly_stats = QualityDataService.get_quality_stats(user=request.user, empresa=user_company)
+    monthly_stats = QualityDataService.get_quality_stats(user=request.user, company_id=company_id)
     
     return Response({
         'stats': stats,
-        'recent_data': recent_data_serializer.data,
+        'recent_data': recent_data,
         'monthly_stats': monthly_stats,
         'monthly_data_count': monthly_data.count()
     })
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_export(request):
     """
     Exporta datos de calidad en formato CSV filtrados por empresa del usuario
     """
-    # Usar la empresa del usuario logueado
-    user_company = None
-    if request.user.is_authenticated and request.user.company:
-        user_company = request.user.company.name
-    
-    # Obtener queryset filtrado por empresa del usuario
-    queryset = QualityData.objects.all()
-    if user_company:
-        queryset = queryset.filter(empresa=user_company)
-    else:
-        # Si el usuario no tiene empresa asignada, no mostrar datos
-        queryset = QualityData.objects.none()
+    # Obtener queryset filtrado por empresa del usuario (vacío si no tiene empresa)
+    queryset = QualityDataService.get_quality_data_for_user_company(request.user)
     
     # Aplicar filtros adicionales
     empresa = request.query_params.get('empresa')
@@ -300,11 +429,11 @@ def quality_data_export(request):
         except:
             pass
     
-    # Serializar datos de forma síncrona
-    serializer = QualityDataListSerializer(queryset, many=True)
+    # Serializar datos con la ruta de lectura rápida
+    reader = QualityDataListReader()
     
     return Response({
-        'data': serializer.data,
+        'data': reader.serialize(reader.project(queryset)),
         'total_records': queryset.count(),
         'export_date': timezone.now().isoformat()
     })
@@ -83,7 +83,6 @@ if os.path.exists(db_path):
     conn.execute('PRAGMA synchronous=NORMAL')
     conn.execute('PRAGMA cache_size=10000')
     conn.execute('PRAGMA temp_store=MEMORY')
-    conn.execute('PRAGMA locking_mode=EXCLUSIVE')
     conn.execute('VACUUM')
     conn.execute('ANALYZE')
     conn.close()
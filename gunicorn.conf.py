@@ -29,6 +29,12 @@ limit_request_field_size = 8190
 gevent_monkey_patch = True
 
 # Configuración de workers
+def on_starting(server):
+    # Reiniciar las métricas por endpoint (agro_backend.metrics) en cada arranque
+    from agro_backend.metrics import DEFAULT_METRICS_DIR, clear_metrics_dir
+    metrics_dir = os.getenv('METRICS_DIR', DEFAULT_METRICS_DIR)
+    clear_metrics_dir(metrics_dir)
+
 def worker_int(worker):
     worker.log.info("worker received INT or QUIT signal")
 
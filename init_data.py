@@ -14,6 +14,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agro_backend.settings')
 django.setup()
 
 from apps.authentication.models import User, Company, Role
+from apps.authentication.storage import decode_base64_image
 from apps.production.models import Product, Shipment, Inspection, QualityReport, Sample
 
 def create_test_roles():
@@ -89,7 +90,7 @@ def create_test_roles():
 
 
 def create_test_companies():
-    """Crear empresas de prueba con logos en Base64"""
+    """Crear empresas de prueba con logos (guardados como archivos)"""
     
     # Logo simple en Base64 (un cuadrado azul simple)
     simple_logo = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
@@ -137,6 +138,7 @@ def create_test_companies():
     ]
     
     for company_data in companies_data:
+        company_data['logo'] = decode_base64_image(company_data['logo'], 'logo')
         company, created = Company.objects.get_or_create(
             domain=company_data['domain'],
             defaults=company_data
@@ -1,5 +1,11 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
+# Gevent monkey patching debe ir ANTES de cualquier import de Django
+# (igual que en gunicorn_async.py); si se aplica recién al cargar settings,
+# el parcheo de locks existentes se bloquea con el lazy settings de Django
+import gevent.monkey
+gevent.monkey.patch_all()
+
 import os
 import sys
 
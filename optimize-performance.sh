@@ -66,6 +66,9 @@ for i in {1..3}; do
     time curl -s -o /dev/null -w "Status: %{http_code}, Tiempo: %{time_total}s\n" http://localhost:8000/api/
 done
 
+echo "ℹ️ Para medir throughput y latencias p50/p95/p99 por endpoint:"
+echo "   python manage.py load_test --baseline loadtest_results/<corrida-anterior>.json"
+
 echo "✅ Optimización completada!"
 echo ""
 echo "📋 Mejoras aplicadas:"
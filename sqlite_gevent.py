@@ -1,62 +1,126 @@
 """
-Configuración de SQLite para gevent
-Este módulo debe importarse ANTES de cualquier import de Django
+Conexiones SQLite para workers gevent.
+
+SQLite en modo WAL admite muchos lectores concurrentes y un solo escritor,
+sin que los lectores bloqueen al escritor ni al revés. Por eso aquí no hay
+un lock global ni locking_mode=EXCLUSIVE (que serializaba el worker y dejaba
+a los demás workers sin acceso a la base):
+
+- Todas las conexiones usan WAL y synchronous=NORMAL
+- ConnectionPool guarda las conexiones abiertas para reutilizarlas entre
+  peticiones (cada greenlet tiene la suya); las lecturas no esperan a nadie
+- WriteQueue da el turno de escritura del proceso en orden de llegada: un
+  escritor espera en la cola en lugar de chocar con SQLITE_BUSY. Entre
+  workers, el timeout de SQLite (busy_timeout) hace de cola
+
+El backend de Django que usa estas piezas es agro_backend.sqlite_backend.
+Este módulo se importa antes que Django (settings, gunicorn_async) solo por
+compatibilidad: ya no modifica sqlite3.
 """
 
+import os
 import sqlite3
 import threading
-import os
 from contextlib import contextmanager
 
-# Lock global para SQLite
-_sqlite_lock = threading.RLock()
-
-# Configurar SQLite para ser thread-safe
-sqlite3.threadsafety = 1
-
-class ThreadSafeSQLiteConnection:
-    """Conexión SQLite thread-safe para gevent"""
-    
-    def __init__(self, database, **kwargs):
-        self.database = database
-        self.kwargs = kwargs
-        self._connection = None
-        self._lock = _sqlite_lock
-    
-    def __enter__(self):
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', '-20000'),  # ~20 MB de caché de páginas por conexión
+    ('temp_store', 'MEMORY'),
+)
+
+DEFAULT_POOL_SIZE = 8
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+
+def configure_connection(connection):
+    """Aplica los PRAGMAs de rendimiento a una conexión nueva"""
+    for pragma, value in PRAGMAS:
+        connection.execute(f'PRAGMA {pragma}={value}')
+    return connection
+
+
+def is_write_statement(sql):
+    return sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS)
+
+
+class ConnectionPool:
+    """
+    Conexiones inactivas de una base, listas para reutilizar. LIFO: la
+    última devuelta tiene la caché de páginas más caliente. Si no hay
+    ninguna se abre otra; al devolver, las que sobran de `size` se cierran
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self):
+        """Retorna una conexión inactiva o None"""
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def release(self, connection):
+        if connection.in_transaction:
+            connection.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close_all(self):
         with self._lock:
-            self._connection = sqlite3.connect(self.database, **self.kwargs)
-            # Configurar para mejor rendimiento con gevent
-            self._connection.execute('PRAGMA journal_mode=WAL')
-            self._connection.execute('PRAGMA synchronous=NORMAL')
-            self._connection.execute('PRAGMA cache_size=10000')
-            self._connection.execute('PRAGMA temp_store=MEMORY')
-            self._connection.execute('PRAGMA locking_mode=EXCLUSIVE')
-            return self._connection
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._connection:
-            with self._lock:
-                self._connection.close()
-
-def thread_safe_connect(database, **kwargs):
-    """Función thread-safe para conectar a SQLite"""
-    # Asegurar que el directorio existe
-    db_dir = os.path.dirname(database)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir, exist_ok=True)
-    
-    # Asegurar permisos de escritura
-    if os.path.exists(database):
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class WriteQueue:
+    """Turno de escritura del proceso para una base: un escritor a la vez, en orden de llegada"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        if not self._lock.acquire(timeout=timeout):
+            raise sqlite3.OperationalError('database is locked (tiempo de espera en la cola de escritura)')
+
+    def release(self):
+        self._lock.release()
+
+    @contextmanager
+    def turn(self, timeout):
+        self.acquire(timeout)
         try:
-            os.chmod(database, 0o666)
-        except OSError:
-            pass
-    
-    return ThreadSafeSQLiteConnection(database, **kwargs)
-
-# Reemplazar la función connect de sqlite3
-sqlite3.connect = thread_safe_connect
+            yield
+        finally:
+            self.release()
+
+
+_registry_lock = threading.Lock()
+_pools = {}
+_write_queues = {}
+
+
+def get_connection_pool(database, size=DEFAULT_POOL_SIZE):
+    """Pool del proceso para la base `database`"""
+    with _registry_lock:
+        if database not in _pools:
+            _pools[database] = ConnectionPool(size)
+        return _pools[database]
+
+
+def get_write_queue(database):
+    """Cola de escritura del proceso para la base `database`"""
+    with _registry_lock:
+        if database not in _write_queues:
+            _write_queues[database] = WriteQueue()
+        return _write_queues[database]
+
 
 # Función helper para verificar permisos
 def ensure_db_permissions(db_path):